@@ -0,0 +1,158 @@
+import threading
+import time
+from FramePool import FrameRing, FrameSubscription, StreamProfile
+from SharedFrames import SharedFramePublisher
+from Metrics import LatencyHistogram
+
+
+class BaseHub:
+    """
+    프레임 허브 공통 기능 (RealSenseHub / ReplayHub)
+    - 구독 관리, 링 슬롯 복사 후 구독자별 배포, 공유 메모리 배포
+    - 서브클래스는 start()/stop()과 프레임 생산 루프만 구현하고 _publish()로 내보냄
+    """
+    def __init__(self, width=640, height=480, fps=30, pool_size=8):
+        self.width, self.height, self.fps = width, height, fps
+
+        self._lock = threading.Lock()
+        self._subs = []              # each: FrameSubscription
+        # 프레임마다 새 배열을 만들지 않고 미리 잡아둔 슬롯을 돌려 씀
+        self._ring = FrameRing(width, height, size=pool_size)
+        self._shared = []            # 공유 메모리 퍼블리셔 (publish_shared)
+        self._running = False
+        self._thread = None
+
+        self.depth_scale = None
+        self.depth_intrin = None
+
+        # 계측 (stats()로 조회)
+        self.frames_in = 0           # 생산된 프레임
+        self.frames_published = 0    # 구독자에게 배포된 프레임
+        self._t_loop = LatencyHistogram()    # 프레임 1장 처리(정렬+복사+배포) 시간
+        self._t_align = LatencyHistogram()
+        self._t_copy = LatencyHistogram()
+
+    def start(self):
+        """프레임 생산 시작 (서브클래스에서 구현)"""
+        raise NotImplementedError
+
+    def stop(self):
+        with self._lock:
+            self._running = False
+
+    def subscribe(self, maxlen=1, profile: StreamProfile = None, callback=None, name=None) -> FrameSubscription:
+        """
+        FrameSubscription 반환. sub.get(timeout)으로 받은 FrameRef는 다 쓰면 release() 해야 함.
+        profile을 주지 않으면 정렬된 color+depth를 전체 fps로 받음.
+        callback을 주면 허브 스레드에서 callback(ref)로 바로 전달 (반환 후 자동 release).
+        name은 stats()에 표시되는 구독자 이름.
+        """
+        sub = FrameSubscription(self, maxlen=maxlen, profile=profile, callback=callback, name=name)
+        with self._lock:
+            self._subs.append(sub)
+            running = self._running
+        if not running:
+            self.start()
+        return sub
+
+    def unsubscribe(self, sub: FrameSubscription):
+        with self._lock:
+            if sub in self._subs:
+                self._subs.remove(sub)
+        # 남아 있던 참조 반환 + get() 대기 중인 소비자 깨우기
+        sub._close()
+
+    def publish_shared(self, name="4youreyes_frames", slots=4, profile: StreamProfile = None):
+        """
+        프레임을 multiprocessing.shared_memory 링으로도 배포.
+        다른 프로세스(NLI/ViT 워커 등)는 SharedFrameReader(name)으로 복사 없이 접근.
+        """
+        profile = profile or StreamProfile()
+        pub = SharedFramePublisher(name, self.width, self.height, slots=slots,
+                                   color=profile.color, depth=profile.depth)
+        pub.subscription = self.subscribe(profile=profile, callback=pub, name=f"shared:{name}")
+        with self._lock:
+            self._shared.append(pub)
+        return pub
+
+    def get_info(self):
+        """소비자들이 3D 변환 등에 쓰는 메타."""
+        return {
+            "width": self.width, "height": self.height, "fps": self.fps,
+            "depth_scale": self.depth_scale, "depth_intrinsics": self.depth_intrin
+        }
+
+    def stats(self):
+        """허브/구독자 계측 스냅샷 (갱신은 카운터·히스토그램 증가뿐이라 비용 거의 없음)"""
+        with self._lock:
+            subs = list(self._subs)
+        return {
+            "frames_in": self.frames_in,
+            "frames_published": self.frames_published,
+            "ring_starved": self._ring.starved,
+            "ring_in_use": self._ring.in_use(),
+            "loop_ms": self._t_loop.snapshot(),
+            "align_ms": self._t_align.snapshot(),
+            "copy_ms": self._t_copy.snapshot(),
+            "subscribers": [s.stats() for s in subs],
+        }
+
+    def _due_subscribers(self):
+        """이번 프레임을 받을 구독자 목록 (간축 상태가 진행됨)"""
+        self.frames_in += 1
+        now = time.monotonic()
+        with self._lock:
+            return [s for s in self._subs if s.due(now)]
+
+    def _publish(self, due, color_bgr=None, depth_z16=None, aligned=False):
+        """
+        센서 버퍼를 링 슬롯에 복사한 뒤 due 구독자들에게 FrameRef 배포.
+        빈 슬롯이 없으면 프레임을 버리고 False 반환.
+        """
+        idx = self._ring.acquire()
+        if idx is None:
+            # 모든 슬롯을 소비자가 잡고 있음 → 이번 프레임은 버림
+            return False
+        t0 = time.perf_counter()
+        try:
+            self._ring.write(idx, color_bgr, depth_z16)
+        except Exception:
+            self._ring.publish(idx, 0.0, 0)
+            raise
+        self._t_copy.add(time.perf_counter() - t0)
+        ts = time.time()
+
+        callbacks = []
+        with self._lock:
+            # 그 사이 구독 해제된 쪽은 제외
+            live = [s for s in due if s in self._subs]
+            refs = self._ring.publish(idx, ts, len(live), aligned=aligned)
+            for s, ref in zip(live, refs):
+                if not s.profile.color or color_bgr is None:
+                    ref.color = None
+                if not s.profile.depth or depth_z16 is None:
+                    ref.depth = None
+                if s.callback is not None:
+                    callbacks.append((s, ref))
+                else:
+                    s._push(ref)
+
+        self.frames_published += 1
+
+        # 콜백은 허브 락 밖에서 호출
+        for s, ref in callbacks:
+            try:
+                s._on_callback(ref)
+                s.callback(ref)
+            except Exception as e:
+                print("[Hub] subscriber callback error:", e)
+            finally:
+                ref.release()
+        return True
+
+    def _cleanup(self):
+        self.stop()
+        with self._lock:
+            shared, self._shared = self._shared, []
+        for pub in shared:
+            pub.close()
@@ -0,0 +1,252 @@
+import threading
+import time
+from collections import deque
+import numpy as np
+from Metrics import LatencyHistogram
+
+
+class FrameRef:
+    """
+    링 슬롯 하나에 대한 읽기 전용 핸들.
+    - 기존 튜플처럼 `ts, color_bgr, depth_z16 = ref` 로 풀어 쓸 수 있음.
+    - 다 쓴 뒤 release() 를 반드시 호출해야 슬롯이 재사용됨 (with 문 사용 가능).
+    - release() 이후에는 color/depth 배열 내용이 바뀔 수 있으므로 필요하면 copy() 해둘 것.
+    - 구독 프로파일에서 요청하지 않은 스트림은 None.
+    - aligned: depth가 color 기준으로 정렬되었는지 여부.
+    """
+    __slots__ = ("ts", "color", "depth", "aligned", "_ring", "_idx", "_released")
+
+    def __init__(self, ring, idx, ts, color=True, depth=True, aligned=False):
+        self.ts = ts
+        self.color = ring._color_ro[idx] if color else None
+        self.depth = ring._depth_ro[idx] if depth else None
+        self.aligned = aligned
+        self._ring = ring
+        self._idx = idx
+        self._released = False
+
+    def __iter__(self):
+        return iter((self.ts, self.color, self.depth))
+
+    def release(self):
+        self._ring._release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+class FrameRing:
+    """
+    미리 할당된 color/depth 슬롯 링 (참조 카운트 기반 재사용).
+    - acquire(): 아무도 잡고 있지 않은 슬롯을 writer 용으로 예약
+    - write(): 센서 버퍼를 슬롯에 복사 (새 배열 할당 없음)
+    - publish(): 구독자 수만큼 FrameRef 발급, 모두 release 되면 슬롯 반환
+    """
+    def __init__(self, width, height, size=8):
+        self.width, self.height, self.size = width, height, size
+        self._color = np.empty((size, height, width, 3), dtype=np.uint8)
+        self._depth = np.empty((size, height, width), dtype=np.uint16)
+
+        # 구독자에게 나가는 건 쓰기 금지 view
+        self._color_ro = []
+        self._depth_ro = []
+        for i in range(size):
+            c = self._color[i].view()
+            d = self._depth[i].view()
+            c.flags.writeable = False
+            d.flags.writeable = False
+            self._color_ro.append(c)
+            self._depth_ro.append(d)
+
+        self._refs = [0] * size
+        self._next = 0
+        self._lock = threading.Lock()
+        self.starved = 0              # 빈 슬롯이 없어 버린 프레임 수
+
+    def acquire(self):
+        """비어 있는 슬롯 인덱스 반환. 모두 사용 중이면 None."""
+        with self._lock:
+            for k in range(self.size):
+                idx = (self._next + k) % self.size
+                if self._refs[idx] == 0:
+                    self._refs[idx] = 1   # writer 예약
+                    self._next = (idx + 1) % self.size
+                    return idx
+            self.starved += 1
+            return None
+
+    def write(self, idx, color_bgr=None, depth_z16=None):
+        """None 으로 넘긴 스트림은 복사하지 않음."""
+        if color_bgr is not None:
+            np.copyto(self._color[idx], color_bgr)
+        if depth_z16 is not None:
+            np.copyto(self._depth[idx], depth_z16)
+
+    def publish(self, idx, ts, count, color=True, depth=True, aligned=False):
+        """writer 예약을 구독자 count 개의 참조로 바꿔 FrameRef 리스트 반환 (count=0이면 즉시 반환)."""
+        with self._lock:
+            self._refs[idx] = count
+        return [FrameRef(self, idx, ts, color, depth, aligned) for _ in range(count)]
+
+    def _release(self, ref):
+        with self._lock:
+            if ref._released:
+                return
+            ref._released = True
+            self._refs[ref._idx] -= 1
+
+    def in_use(self):
+        with self._lock:
+            return sum(1 for r in self._refs if r > 0)
+
+
+class StreamProfile:
+    """
+    구독자별 스트림 요구사항.
+    - color/depth: 받을 스트림 (안 받는 쪽은 FrameRef에서 None)
+    - align: depth를 color 기준으로 정렬해서 받아야 하는지
+    - fps: 목표 수신 fps (None이면 decimate 사용)
+    - decimate: N프레임마다 1장 수신 (1이면 전체)
+    """
+    def __init__(self, color=True, depth=True, align=True, fps=None, decimate=1):
+        if not color and not depth:
+            raise ValueError("color/depth 중 하나는 받아야 합니다.")
+        self.color = bool(color)
+        self.depth = bool(depth)
+        self.align = bool(align) and self.depth
+        self.fps = fps
+        self.decimate = max(1, int(decimate))
+
+    @classmethod
+    def color_only(cls, fps=None, decimate=1):
+        return cls(color=True, depth=False, align=False, fps=fps, decimate=decimate)
+
+    @classmethod
+    def depth_only(cls, align=False, fps=None, decimate=1):
+        return cls(color=False, depth=True, align=align, fps=fps, decimate=decimate)
+
+
+class FrameSubscription:
+    """
+    허브 구독 핸들 (조건변수 기반, 폴링 불필요).
+    - get(timeout): 프레임이 올 때까지 대기 후 FrameRef 반환 (timeout 시 None)
+    - get_newer_than(ts, timeout): ts 보다 새 프레임이 올 때까지 대기
+    - callback 모드: 허브 스레드에서 callback(ref) 호출, 반환 후 허브가 release
+      (콜백은 짧게 끝내고, 프레임을 보관하려면 copy() 할 것)
+    get()으로 받은 FrameRef는 받은 쪽이 release() 해야 함.
+    stats(): 전달/미사용 폐기 수, 캡처→소비 시점 나이(age-at-read) 히스토그램
+    """
+    def __init__(self, hub, maxlen=1, profile=None, callback=None, name=None):
+        self.hub = hub
+        self.maxlen = maxlen
+        self.profile = profile or StreamProfile()
+        self.callback = callback
+        self.name = name or f"sub-{id(self):x}"
+        self._q = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        # 간축(decimation) 상태
+        self._count = 0
+        self._next_t = 0.0
+        # 계측
+        self.delivered = 0            # 허브가 넘겨준 프레임 수
+        self.dropped = 0              # 읽히기 전에 밀려나거나 버려진 프레임 수
+        self.read_age = LatencyHistogram()
+
+    def due(self, now):
+        """이번 프레임을 받을 차례인지 (호출 시 상태가 진행됨)"""
+        p = self.profile
+        if p.fps:
+            if now < self._next_t:
+                return False
+            period = 1.0 / p.fps
+            self._next_t += period
+            if self._next_t < now:
+                # 오래 밀렸으면 따라잡기 연사 대신 지금 기준으로 재설정
+                self._next_t = now + period
+            return True
+        self._count += 1
+        return (self._count - 1) % p.decimate == 0
+
+    def _push(self, ref):
+        """허브 전용: 큐에 넣고 대기 중인 소비자를 깨움. 밀려난 참조는 여기서 release."""
+        with self._cond:
+            if self._closed:
+                ref.release()
+                return
+            self.delivered += 1
+            if self.maxlen is not None and len(self._q) >= self.maxlen:
+                self._q.popleft().release()
+                self.dropped += 1
+            self._q.append(ref)
+            self._cond.notify_all()
+
+    def _take(self):
+        ref = self._q.popleft()
+        self.read_age.add(time.time() - ref.ts)
+        return ref
+
+    def get(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._q or self._closed, timeout):
+                return None
+            if not self._q:
+                return None
+            return self._take()
+
+    def get_newer_than(self, ts, timeout=None):
+        """ts 이후 캡처된 프레임 반환. 그보다 오래된 것은 버림(release)."""
+        def ready():
+            while self._q and self._q[0].ts <= ts:
+                self._q.popleft().release()
+                self.dropped += 1
+            return self._q or self._closed
+
+        with self._cond:
+            if not self._cond.wait_for(ready, timeout):
+                return None
+            if not self._q:
+                return None
+            return self._take()
+
+    def _on_callback(self, ref):
+        """허브 전용: 콜백 모드 전달 계측"""
+        self.delivered += 1
+        self.read_age.add(time.time() - ref.ts)
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "pending": len(self._q),
+            "age_at_read": self.read_age.snapshot(),
+        }
+
+    def pending(self):
+        with self._cond:
+            return len(self._q)
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+    def _close(self):
+        """허브 전용: 남은 참조 반환 후 대기자 깨움."""
+        with self._cond:
+            self._closed = True
+            while self._q:
+                self._q.popleft().release()
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,8 +1,12 @@
 from system.SafetyEventHandler import threading
 from Realsense import RealSenseHub
+from FramePool import StreamProfile
+from Replay import ReplayHub
 from Tts import TextToSpeechApp
-from Stt import SpeechRecognitionApp, sr
+from Stt import SpeechRecognitionApp
+from VoiceListener import VoiceListener
 import queue
+import os
 
 class HardwareResourceManager:
     """하드웨어 리소스를 중앙에서 관리하는 싱글톤 클래스"""
@@ -29,15 +33,31 @@ class HardwareResourceManager:
         self._camera_instance = None
         self._speaker_instance = None
         self._mic_instance = None
+
+        # 카메라 소스: 녹화 파일 경로가 있으면 실제 카메라 대신 ReplayHub 사용
+        self.replay_path = os.environ.get("RS_REPLAY_FILE") or None
+        self.replay_realtime = True
         
         self.initialized = True
     
+    def use_replay(self, path, realtime=True):
+        """get_camera()가 실제 RealSense 대신 녹화 파일을 재생하도록 설정 (첫 get_camera 전에 호출)"""
+        with self.camera_lock:
+            if self._camera_instance is not None:
+                raise RuntimeError("카메라가 이미 초기화되었습니다.")
+            self.replay_path = path
+            self.replay_realtime = realtime
+
     def get_camera(self):
         # 카메라 허브는 시작 시 한 번만 초기화되므로 복잡한 락킹 불필요
         if self._camera_instance is None:
             with self.camera_lock:
                 if self._camera_instance is None:
-                    self._camera_instance = RealSenseHub(width=640, height=480, fps=30)
+                    if self.replay_path:
+                        print(f"📼 녹화 파일 재생 카메라 사용: {self.replay_path}")
+                        self._camera_instance = ReplayHub(self.replay_path, realtime=self.replay_realtime)
+                    else:
+                        self._camera_instance = RealSenseHub(width=640, height=480, fps=30)
                     self._camera_instance.start()
         return self._camera_instance
     
@@ -78,59 +98,44 @@ class HardwareResourceManager:
 class VoiceCommandHandler:
     """
     마이크 녹음을 제어하고 음성을 텍스트로 변환하는 작업을 처리하는 클래스.
-    (AttributeError를 수정한 버전)
+    녹음 중에는 VoiceListener가 마이크를 계속 캡처하고, 말이 끝날 때마다 그 구간을 인식해 text_queue에 넣음.
     """
+    PROMPT = "3초 뒤에 말을 해주세요"
+    PROMPT_HOLDOFF_S = 3.0      # 안내 멘트가 재생되는 동안 시작한 발화는 무시
+
     def __init__(self):
         self.stt_app = SpeechRecognitionApp()
         self.is_recording = False
-        self.stop_event = threading.Event()
-        self.recording_thread = None
         self.text_queue = queue.Queue()
+        # 세션마다 새로 만들지 않아 잡음 바닥이 세션을 넘어 유지됨
+        self.listener = VoiceListener(self.stt_app.recognizer, self.stt_app.language, self._on_text,
+                                      holdoff_s=self.PROMPT_HOLDOFF_S)
 
-    def _record_and_transcribe_loop(self):
-        # 1) 안내 멘트는 스피커에 위임 (비블로킹)
-        try:
-            from HardwareSystem.HardwareResourceManager import hardware_manager
-            hardware_manager.get_speaker().process("3초 뒤에 말을 해주세요")
-        except Exception as e:
-            print(f"[TTS 안내 멘트 실패] {e}")
-
-        mic = sr.Microphone()
-        with mic as source:
-            self.stt_app.recognizer.adjust_for_ambient_noise(source)
-            print("🎤 (백그라운드) 음성 녹음 스레드 시작. 입력을 기다립니다...")
+    def _on_text(self, text):
+        print(f"🔊 (백그라운드) 음성 인식 성공: {text}")
+        self.text_queue.put(text)
 
-            while not self.stop_event.is_set():
-                try:
-                    audio = self.stt_app.recognizer.listen(source, timeout=1.0, phrase_time_limit=5)
-                    text = self.stt_app.recognizer.recognize_google(audio, language=self.stt_app.language)
-                    if text:
-                        print(f"🔊 (백그라운드) 음성 인식 성공: {text}")
-                        self.text_queue.put(text)
-                except sr.WaitTimeoutError:
-                    continue
-                except Exception as e:
-                    print(f"🔥 녹음/인식 중 오류: {e}")
-
-
-    # (start_recording, stop_recording, get_transcribed_text 메서드는 변경 없음)
     def start_recording(self):
         if self.is_recording:
             print("⚠️ 이미 녹음이 진행 중입니다.")
             return
+        # 이전 세션의 인식이 아직 돌고 있으면 시작하지 않음
+        if not self.listener.start():
+            return
         self.is_recording = True
-        self.stop_event.clear()
-        self.recording_thread = threading.Thread(target=self._record_and_transcribe_loop)
-        self.recording_thread.start()
+        # 안내 멘트는 스피커에 위임 (비블로킹)
+        try:
+            from HardwareSystem.HardwareResourceManager import hardware_manager
+            hardware_manager.get_speaker().process(self.PROMPT)
+        except Exception as e:
+            print(f"[TTS 안내 멘트 실패] {e}")
         print("▶️ 음성 녹음을 시작합니다.")
 
     def stop_recording(self):
         if not self.is_recording:
             print("⚠️ 녹음 중이 아닙니다.")
             return
-        self.stop_event.set()
-        if self.recording_thread:
-            self.recording_thread.join(timeout=2.0)
+        self.listener.stop()
         self.is_recording = False
         print("⏹️ 음성 녹음을 중지합니다.")
 
@@ -139,5 +144,8 @@ class VoiceCommandHandler:
             return self.text_queue.get_nowait()
         except queue.Empty:
             return None
+
+    def stats(self):
+        return self.listener.stats()
         
 hardware_manager = HardwareResourceManager()
\ No newline at end of file
@@ -0,0 +1,52 @@
+from bisect import bisect_left
+
+
+class LatencyHistogram:
+    """
+    고정 버킷(ms) 지연 히스토그램.
+    - add(): bisect 1회 + 정수 덧셈뿐이라 프레임 루프 안에서 호출해도 부담 없음
+    - 락을 쓰지 않으므로 여러 스레드가 동시에 갱신하면 드물게 1~2건 누락될 수 있음 (통계용)
+    """
+    BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+    def __init__(self, bounds_ms=None):
+        self.bounds_ms = tuple(bounds_ms or self.BOUNDS_MS)
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds_ms) + 1)   # 마지막 칸: 최대 경계 초과
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, seconds):
+        ms = seconds * 1000.0
+        self.counts[bisect_left(self.bounds_ms, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, q):
+        """버킷 상한 기준 근사 백분위(ms, 최대값 이하로 제한). q: 0~100"""
+        if self.count == 0:
+            return 0.0
+        target = self.count * q / 100.0
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target and c:
+                return min(float(self.bounds_ms[i]), self.max_ms) if i < len(self.bounds_ms) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self):
+        labels = [f"<={b}ms" for b in self.bounds_ms] + [f">{self.bounds_ms[-1]}ms"]
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "max_ms": self.max_ms,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "buckets": {l: c for l, c in zip(labels, self.counts) if c},
+        }
@@ -1,30 +1,26 @@
 import cv2
-import pyrealsense2 as rs
+try:
+    import pyrealsense2 as rs
+except ImportError:              # 카메라 없는 개발/CI 환경 (ReplayHub만 사용)
+    rs = None
 from system.SafetyEventHandler import threading
-from collections import deque
+from BaseHub import BaseHub
 import numpy as np
 import time
 
 
-
 # === Hub: RealSense를 1번만 열어 모두에게 배포 ===
-class RealSenseHub:
-    def __init__(self, width=640, height=480, fps=30):
-        self.width, self.height, self.fps = width, height, fps
+class RealSenseHub(BaseHub):
+    def __init__(self, width=640, height=480, fps=30, pool_size=8):
+        if rs is None:
+            raise RuntimeError("pyrealsense2가 설치되어 있지 않습니다. (녹화 파일 재생은 ReplayHub 사용)")
+        super().__init__(width, height, fps, pool_size=pool_size)
         self.pipeline = rs.pipeline()
         self.config = rs.config()
         self.config.enable_stream(rs.stream.depth, width, height, rs.format.z16, fps)
         self.config.enable_stream(rs.stream.color, width, height, rs.format.bgr8, fps)
         self._align = rs.align(rs.stream.color)
 
-        self._lock = threading.Lock()
-        self._subs = []              # each: deque(maxlen=1)
-        self._running = False
-        self._thread = None
-
-        self.depth_scale = None
-        self.depth_intrin = None
-
     def start(self):
         with self._lock:
             if self._running:
@@ -46,55 +42,42 @@ class RealSenseHub:
             self._thread = threading.Thread(target=self._loop, daemon=True)
             self._thread.start()
 
-    def subscribe(self, maxlen=1) -> deque:
-        q = deque(maxlen=maxlen)
-        with self._lock:
-            self._subs.append(q)
-            if not self._running:
-                self.start()
-        return q
-
-    def unsubscribe(self, q: deque):
-        with self._lock:
-            if q in self._subs:
-                self._subs.remove(q)
-
-    def get_info(self):
-        """소비자들이 3D 변환 등에 쓰는 메타."""
-        return {
-            "width": self.width, "height": self.height, "fps": self.fps,
-            "depth_scale": self.depth_scale, "depth_intrinsics": self.depth_intrin
-        }
-
     def _loop(self):
         while self._running:
             try:
                 frames = self.pipeline.wait_for_frames()
-                frames = self._align.process(frames)
-                df = frames.get_depth_frame()
-                cf = frames.get_color_frame()
-                if not df or not cf:
+                t_start = time.perf_counter()
+                due = self._due_subscribers()
+                if not due:
+                    # 이번 프레임을 받을 구독자가 없으면 정렬/복사 생략
                     continue
 
-                # 💡 RealSense frame은 다음 루프에서 메모리 해제되므로 안전하게 copy
-                color_bgr = np.asanyarray(cf.get_data()).copy()
-                depth_z16 = np.asanyarray(df.get_data()).copy()
-                ts = time.time()
+                want_color = any(s.profile.color for s in due)
+                want_depth = any(s.profile.depth for s in due)
+                # 정렬이 필요한 구독자가 있을 때만 rs.align 수행 (가장 비싼 단계)
+                need_align = any(s.profile.align for s in due)
+                if need_align:
+                    t0 = time.perf_counter()
+                    frames = self._align.process(frames)
+                    self._t_align.add(time.perf_counter() - t0)
+                cf = frames.get_color_frame() if want_color else None
+                df = frames.get_depth_frame() if want_depth else None
+                if (want_color and not cf) or (want_depth and not df):
+                    continue
 
-                with self._lock:
-                    for q in self._subs:
-                        q.append((ts, color_bgr, depth_z16))
+                # 💡 RealSense frame은 다음 루프에서 메모리 해제되므로 링 슬롯에 복사 (새 할당 없음)
+                self._publish(due,
+                              np.asanyarray(cf.get_data()) if cf else None,
+                              np.asanyarray(df.get_data()) if df else None,
+                              aligned=need_align)
+                self._t_loop.add(time.perf_counter() - t_start)
             except Exception as e:
                 print(f"[Hub] capture error:", e)
                 time.sleep(0.01)
 
     def stop(self):
-        with self._lock:
-            self._running = False
+        super().stop()
         try:
             self.pipeline.stop()
         except:
             pass
-
-    def _cleanup(self):
-        self.stop()
\ No newline at end of file
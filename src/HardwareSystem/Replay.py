@@ -0,0 +1,237 @@
+import os
+import json
+import time
+import struct
+import threading
+from types import SimpleNamespace
+import numpy as np
+from BaseHub import BaseHub
+from FramePool import StreamProfile
+
+# 파일 구조: [MAGIC 8B][헤더 길이 u32][헤더 JSON ... DATA_OFFSET 까지 패딩][고정 크기 레코드 ...]
+# 레코드: ts(f8) [+ color(u1,h*w*3)] [+ depth(u2,h*w)]  → np.memmap 으로 바로 매핑 가능
+_MAGIC = b"4YEREC01"
+_DATA_OFFSET = 4096
+_INTRIN_FIELDS = ("width", "height", "ppx", "ppy", "fx", "fy")
+
+
+def _record_dtype(width, height, has_color, has_depth):
+    fields = [("ts", "<f8")]
+    if has_color:
+        fields.append(("color", "u1", (height, width, 3)))
+    if has_depth:
+        fields.append(("depth", "<u2", (height, width)))
+    return np.dtype(fields)
+
+
+def _intrin_to_dict(intrin):
+    if intrin is None:
+        return None
+    d = {k: getattr(intrin, k) for k in _INTRIN_FIELDS}
+    d["model"] = str(getattr(intrin, "model", ""))
+    d["coeffs"] = list(getattr(intrin, "coeffs", []))
+    return d
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"녹화 파일 형식이 아닙니다: {path}")
+        (n,) = struct.unpack("<I", f.read(4))
+        return json.loads(f.read(n).decode("utf-8"))
+
+
+class RecordingWriter:
+    """
+    .rsrec 파일 작성기 (HubRecorder 및 합성 프레임 생성에서 공용).
+    header: width, height, fps, depth_scale, depth_intrinsics, has_color, has_depth, aligned
+    """
+    def __init__(self, path, header):
+        blob = json.dumps(header).encode("utf-8")
+        if len(_MAGIC) + 4 + len(blob) > _DATA_OFFSET:
+            raise ValueError("녹화 헤더가 너무 큽니다.")
+        self.header = header
+        self.frames_written = 0
+        self._dtype = _record_dtype(header["width"], header["height"], header["has_color"], header["has_depth"])
+        self._rec = np.zeros(1, dtype=self._dtype)
+        self._fp = open(path, "wb")
+        self._fp.write(_MAGIC + struct.pack("<I", len(blob)) + blob)
+        self._fp.write(b"\0" * (_DATA_OFFSET - self._fp.tell()))
+
+    def write(self, ts, color=None, depth=None):
+        rec = self._rec
+        rec["ts"] = ts
+        if self.header["has_color"]:
+            rec["color"][0] = color
+        if self.header["has_depth"]:
+            rec["depth"][0] = depth
+        self._fp.write(rec.tobytes())
+        self.frames_written += 1
+
+    def close(self):
+        if self._fp is not None:
+            self._fp.flush()
+            self._fp.close()
+            self._fp = None
+
+
+class HubRecorder:
+    """
+    허브의 (ts, color_bgr, depth_z16) 스트림과 get_info() 메타를 파일로 녹화.
+    전용 구독 + 쓰기 스레드 사용 (디스크가 느리면 허브 대신 녹화 쪽에서 프레임이 빠짐).
+        rec = HubRecorder(hub, "scene.rsrec", profile=StreamProfile(fps=15))
+        rec.start(); ...; rec.stop()
+    """
+    def __init__(self, hub, path, profile: StreamProfile = None, max_frames=None):
+        self.hub = hub
+        self.path = path
+        self.profile = profile or StreamProfile()
+        self.max_frames = max_frames
+        self._sub = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._writer = None
+
+    @property
+    def frames_written(self):
+        return self._writer.frames_written if self._writer else 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._sub = self.hub.subscribe(maxlen=2, profile=self.profile, name="recorder")
+        info = self.hub.get_info()
+        header = {
+            "width": info["width"], "height": info["height"], "fps": info["fps"],
+            "depth_scale": info["depth_scale"],
+            "depth_intrinsics": _intrin_to_dict(info["depth_intrinsics"]),
+            "has_color": self.profile.color, "has_depth": self.profile.depth,
+            "aligned": self.profile.align,
+        }
+        self._writer = RecordingWriter(self.path, header)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="HubRecorder", daemon=True)
+        self._thread.start()
+        print(f"[Recorder] 녹화 시작: {self.path}")
+
+    def _loop(self):
+        while not self._stop.is_set():
+            ref = self._sub.get(timeout=0.5)
+            if ref is None:
+                continue
+            with ref:
+                self._writer.write(ref.ts, ref.color if self.profile.color else None,
+                                   ref.depth if self.profile.depth else None)
+            if self.max_frames and self.frames_written >= self.max_frames:
+                break
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=3.0)
+            self._thread = None
+        if self._sub is not None:
+            self._sub.close()
+            self._sub = None
+        if self._writer is not None:
+            self._writer.close()
+            print(f"[Recorder] 녹화 종료: {self.frames_written} 프레임 → {self.path}")
+
+
+class ReplayHub(BaseHub):
+    """
+    HubRecorder 파일을 RealSenseHub 대신 재생하는 가짜 허브 (start/subscribe/unsubscribe/get_info 동일).
+    - realtime=True: 녹화 시각 간격대로 재생 (speed 배속), False: 최대 속도
+    - loop=True: 끝나면 처음부터 반복
+    파일은 memmap으로 열기 때문에 길이와 무관하게 메모리를 거의 쓰지 않음.
+    """
+    def __init__(self, path, realtime=True, speed=1.0, loop=True, pool_size=8):
+        self.path = path
+        self.meta = read_header(path)
+        super().__init__(self.meta["width"], self.meta["height"], self.meta["fps"], pool_size=pool_size)
+        self.realtime = realtime
+        self.speed = speed
+        self.loop = loop
+
+        self._dtype = _record_dtype(self.width, self.height, self.meta["has_color"], self.meta["has_depth"])
+        n = (os.path.getsize(path) - _DATA_OFFSET) // self._dtype.itemsize
+        if n <= 0:
+            raise ValueError(f"녹화된 프레임이 없습니다: {path}")
+        self._records = np.memmap(path, dtype=self._dtype, mode="r", offset=_DATA_OFFSET, shape=(n,))
+        self.frame_count = n
+        self.frames_played = 0
+        self.finished = threading.Event()
+
+        self.depth_scale = self.meta["depth_scale"]
+        intrin = self.meta["depth_intrinsics"]
+        self.depth_intrin = SimpleNamespace(**intrin) if intrin else None
+
+    def start(self):
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self.finished.clear()
+            self._thread = threading.Thread(target=self._loop, name="ReplayHub", daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        recs = self._records
+        has_color, has_depth = self.meta["has_color"], self.meta["has_depth"]
+        aligned = self.meta.get("aligned", False)
+        while self._running:
+            t0_wall = time.monotonic()
+            t0_rec = float(recs[0]["ts"])
+            for i in range(self.frame_count):
+                if not self._running:
+                    break
+                rec = recs[i]
+                if self.realtime:
+                    delay = (float(rec["ts"]) - t0_rec) / self.speed - (time.monotonic() - t0_wall)
+                    if delay > 0:
+                        time.sleep(delay)
+                t_start = time.perf_counter()
+                due = self._due_subscribers()
+                if not due:
+                    continue
+                try:
+                    self._publish(due,
+                                  rec["color"] if has_color else None,
+                                  rec["depth"] if has_depth else None,
+                                  aligned=aligned)
+                    self.frames_played += 1
+                    self._t_loop.add(time.perf_counter() - t_start)
+                except Exception as e:
+                    print("[ReplayHub] 재생 오류:", e)
+            if not self.loop:
+                break
+        with self._lock:
+            self._running = False
+        self.finished.set()
+
+
+if __name__ == "__main__":
+    # 실제 카메라에서 녹화: python Replay.py out.rsrec --seconds 30 --fps 15 [--color-only]
+    import argparse
+    from Realsense import RealSenseHub
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("path")
+    ap.add_argument("--seconds", type=float, default=30.0)
+    ap.add_argument("--fps", type=float, default=None)
+    ap.add_argument("--color-only", action="store_true")
+    args = ap.parse_args()
+
+    hub = RealSenseHub(width=640, height=480, fps=30)
+    hub.start()
+    profile = StreamProfile.color_only(fps=args.fps) if args.color_only else StreamProfile(fps=args.fps)
+    rec = HubRecorder(hub, args.path, profile=profile)
+    rec.start()
+    try:
+        time.sleep(args.seconds)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        rec.stop()
+        hub._cleanup()
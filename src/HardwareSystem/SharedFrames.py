@@ -0,0 +1,212 @@
+import time
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+
+_MAGIC = 0x34594553        # '4YES'
+_CTRL_LEN = 8              # magic, slots, width, height, latest_seq, has_color, has_depth, reserved
+_C_MAGIC, _C_SLOTS, _C_W, _C_H, _C_LATEST, _C_COLOR, _C_DEPTH = range(7)
+
+
+def _layout(slots, width, height):
+    """공유 메모리 안의 배열 배치 {이름: (offset, shape, dtype)} 와 전체 바이트 수"""
+    specs = [
+        ("ctrl", (_CTRL_LEN,), np.int64),
+        ("seq", (slots,), np.int64),            # 슬롯별 시퀀스 (쓰는 중이면 -1)
+        ("ts", (slots,), np.float64),           # 슬롯별 캡처 시각(time.time)
+        ("color", (slots, height, width, 3), np.uint8),
+        ("depth", (slots, height, width), np.uint16),
+    ]
+    layout, off = {}, 0
+    for name, shape, dtype in specs:
+        off = (off + 63) & ~63                  # 64바이트 정렬
+        layout[name] = (off, shape, dtype)
+        off += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return layout, off
+
+
+def _views(buf, layout, writeable=True):
+    views = {}
+    for name, (off, shape, dtype) in layout.items():
+        a = np.ndarray(shape, dtype=dtype, buffer=buf, offset=off)
+        a.flags.writeable = writeable
+        views[name] = a
+    return views
+
+
+def _attach(name):
+    """
+    기존 세그먼트에 붙기. 부모와 무관한 프로세스라면 자체 resource_tracker가 종료 시
+    세그먼트를 지워버리므로 추적을 해제 (자식 프로세스는 부모 tracker를 공유하므로 그대로 둠).
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)   # Python 3.13+
+    except TypeError:
+        pass
+    inherited = getattr(resource_tracker._resource_tracker, "_fd", None) is not None
+    shm = shared_memory.SharedMemory(name=name)
+    if not inherited:
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+    return shm
+
+
+class SharedFramePublisher:
+    """
+    허브 프레임을 multiprocessing.shared_memory 링에 기록 (허브 콜백 구독자로 동작).
+    - 헤더: magic/슬롯 수/해상도/최신 시퀀스, 슬롯별 seq·ts
+    - 슬롯을 쓰는 동안 seq=-1 로 표시 → 읽는 쪽은 seq 재확인으로 찢어진 프레임을 걸러냄
+    생성은 RealSenseHub.publish_shared() 사용 권장.
+    """
+    def __init__(self, name, width, height, slots=4, color=True, depth=True):
+        self.name = name
+        self.width, self.height, self.slots = width, height, slots
+        layout, size = _layout(slots, width, height)
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # 이전 실행이 비정상 종료하며 남긴 세그먼트 정리 후 재생성
+            stale = _attach(name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        v = _views(self.shm.buf, layout)
+        self._ctrl, self._seq_arr, self._ts = v["ctrl"], v["seq"], v["ts"]
+        self._color, self._depth = v["color"], v["depth"]
+        self._ctrl[:] = 0
+        self._seq_arr[:] = 0
+        self._ctrl[_C_SLOTS], self._ctrl[_C_W], self._ctrl[_C_H] = slots, width, height
+        self._ctrl[_C_COLOR], self._ctrl[_C_DEPTH] = int(color), int(depth)
+        self._ctrl[_C_MAGIC] = _MAGIC          # 마지막에 기록 → 읽는 쪽은 magic으로 준비 완료 판단
+
+        self._seq = 0
+        self.subscription = None               # publish_shared()가 연결
+
+    def write(self, ts, color_bgr=None, depth_z16=None):
+        n = self._seq + 1
+        i = n % self.slots
+        self._seq_arr[i] = -1
+        if color_bgr is not None:
+            np.copyto(self._color[i], color_bgr)
+        if depth_z16 is not None:
+            np.copyto(self._depth[i], depth_z16)
+        self._ts[i] = ts
+        self._seq_arr[i] = n
+        self._ctrl[_C_LATEST] = n
+        self._seq = n
+
+    def __call__(self, ref):
+        """허브 콜백: FrameRef를 공유 메모리로 복사"""
+        self.write(ref.ts, ref.color, ref.depth)
+
+    def close(self):
+        if self.subscription is not None:
+            self.subscription.close()
+            self.subscription = None
+        if self.shm is None:
+            return
+        self._ctrl = self._seq_arr = self._ts = self._color = self._depth = None
+        try:
+            self.shm.close()
+            self.shm.unlink()
+        except (BufferError, FileNotFoundError) as e:
+            print(f"[SharedFrames] 정리 오류: {e}")
+        self.shm = None
+
+
+class SharedFrame:
+    """
+    공유 메모리 슬롯에 대한 복사 없는 view.
+    링이 한 바퀴 돌면 덮어써지므로 처리 후 valid()가 True인지 확인하거나, 보관하려면 copy().
+    """
+    __slots__ = ("seq", "ts", "color", "depth", "_reader", "_idx")
+
+    def __init__(self, reader, idx, seq, ts):
+        self.seq = seq
+        self.ts = ts
+        self.color = reader._color[idx] if reader.has_color else None
+        self.depth = reader._depth[idx] if reader.has_depth else None
+        self._reader = reader
+        self._idx = idx
+
+    def valid(self):
+        return int(self._reader._seq_arr[self._idx]) == self.seq
+
+    def __iter__(self):
+        return iter((self.ts, self.color, self.depth))
+
+
+class SharedFrameReader:
+    """
+    다른 프로세스에서 SharedFramePublisher 링에 붙어 프레임을 읽는 쪽.
+        reader = SharedFrameReader("4youreyes_frames")
+        seq = 0
+        while True:
+            f = reader.get_newer_than(seq, timeout=1.0)
+            if f is None: continue
+            seq = f.seq
+            ... f.color 사용 ...
+            if not f.valid(): ...  # 처리 중 덮어써짐 → 결과 폐기
+    """
+    def __init__(self, name, poll_interval=0.002):
+        self.name = name
+        self.poll_interval = poll_interval
+        self.shm = _attach(name)
+        ctrl = np.ndarray((_CTRL_LEN,), dtype=np.int64, buffer=self.shm.buf)
+        if int(ctrl[_C_MAGIC]) != _MAGIC:
+            del ctrl
+            self.shm.close()
+            raise ValueError(f"'{name}' 은(는) 프레임 공유 메모리가 아닙니다.")
+        self.slots, self.width, self.height = int(ctrl[_C_SLOTS]), int(ctrl[_C_W]), int(ctrl[_C_H])
+        self.has_color, self.has_depth = bool(ctrl[_C_COLOR]), bool(ctrl[_C_DEPTH])
+        del ctrl
+
+        layout, _ = _layout(self.slots, self.width, self.height)
+        v = _views(self.shm.buf, layout, writeable=False)
+        self._ctrl, self._seq_arr, self._ts = v["ctrl"], v["seq"], v["ts"]
+        self._color, self._depth = v["color"], v["depth"]
+
+    def latest_seq(self):
+        return int(self._ctrl[_C_LATEST])
+
+    def read_latest(self):
+        """가장 최근 프레임 view. 아직 없거나 쓰는 중이면 None."""
+        n = self.latest_seq()
+        if n <= 0:
+            return None
+        i = n % self.slots
+        ts = float(self._ts[i])
+        if int(self._seq_arr[i]) != n:
+            return None
+        return SharedFrame(self, i, n, ts)
+
+    def get_newer_than(self, seq, timeout=None):
+        """seq 이후의 최신 프레임을 기다려 반환 (프로세스 간 알림이 없어 짧은 주기로 헤더만 확인)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self.latest_seq() > seq:
+                f = self.read_latest()
+                if f is not None:
+                    return f
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(self.poll_interval)
+
+    def close(self):
+        if self.shm is None:
+            return
+        self._ctrl = self._seq_arr = self._ts = self._color = self._depth = None
+        try:
+            self.shm.close()
+        except BufferError as e:
+            # 사용자가 아직 SharedFrame 배열을 잡고 있음
+            print(f"[SharedFrames] 정리 오류: {e}")
+        self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
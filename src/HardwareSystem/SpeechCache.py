@@ -0,0 +1,131 @@
+import os
+import json
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "4youreyes", "tts")
+
+
+class SpeechCache:
+    """
+    합성 음성(오디오 바이트) 2단 캐시. 키: (text, language, slow, engine)
+    - 메모리: 바이트 예산(max_bytes) 기준 LRU
+    - 디스크: sha256(키) 이름의 파일 저장소 (재시작 후에도 유지, 임시 파일 → rename으로 원자적 기록)
+      옆에 .json 메타(원문, 합성 시간)를 둬서 재시작 후 적중에도 절약 시간을 셀 수 있게 함
+    cache_dir=None 이면 메모리 캐시만 사용.
+    """
+    def __init__(self, max_bytes=16 * 1024 * 1024, cache_dir=DEFAULT_CACHE_DIR):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._items = OrderedDict()     # digest -> (audio, 합성 시간)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # 계측
+        self.mem_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.time_saved = 0.0           # 적중으로 건너뛴 합성 시간 합(초)
+        self.synth_time = 0.0           # 실제 합성에 쓴 시간 합(초)
+
+    @staticmethod
+    def key(text, language, slow, engine="gtts"):
+        return hashlib.sha256(f"{engine}\0{language}\0{int(bool(slow))}\0{text}".encode("utf-8")).hexdigest()
+
+    def _path(self, digest, ext):
+        return os.path.join(self.cache_dir, f"{digest}.{ext}")
+
+    def get(self, text, language, slow, engine="gtts"):
+        digest = self.key(text, language, slow, engine)
+        with self._lock:
+            item = self._items.get(digest)
+            if item is not None:
+                self._items.move_to_end(digest)
+                self.mem_hits += 1
+                self.time_saved += item[1]
+                return item[0]
+        if self.cache_dir:
+            try:
+                with open(self._path(digest, "audio"), "rb") as f:
+                    audio = f.read()
+            except OSError:
+                audio = None
+            if audio:
+                cost = self._read_cost(digest)
+                with self._lock:
+                    self.disk_hits += 1
+                    self.time_saved += cost
+                    self._remember(digest, audio, cost)
+                return audio
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, text, language, slow, audio, cost=0.0, engine="gtts"):
+        digest = self.key(text, language, slow, engine)
+        with self._lock:
+            self._remember(digest, audio, cost)
+        if self.cache_dir:
+            try:
+                self._write_atomic(self._path(digest, "audio"), audio)
+                meta = {"text": text, "language": language, "slow": bool(slow), "engine": engine, "synth_s": cost}
+                self._write_atomic(self._path(digest, "json"), json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+            except OSError as e:
+                print(f"[TTS] 음성 캐시 저장 오류: {e}")
+
+    def get_or_synthesize(self, text, language, slow, synth_fn, engine="gtts"):
+        """캐시에 없으면 synth_fn()으로 합성해 두 단계 모두에 저장"""
+        audio = self.get(text, language, slow, engine)
+        if audio is not None:
+            return audio
+        t0 = time.perf_counter()
+        audio = synth_fn()
+        cost = time.perf_counter() - t0
+        with self._lock:
+            self.synth_time += cost
+        self.put(text, language, slow, audio, cost, engine)
+        return audio
+
+    def _remember(self, digest, audio, cost):
+        old = self._items.pop(digest, None)
+        if old is not None:
+            self._bytes -= len(old[0])
+        if len(audio) > self.max_bytes:
+            return
+        self._items[digest] = (audio, cost)
+        self._bytes += len(audio)
+        while self._bytes > self.max_bytes:
+            _, (a, _) = self._items.popitem(last=False)
+            self._bytes -= len(a)
+
+    def _read_cost(self, digest):
+        try:
+            with open(self._path(digest, "json"), "rb") as f:
+                return float(json.loads(f.read()).get("synth_s", 0.0))
+        except (OSError, ValueError):
+            return 0.0
+
+    @staticmethod
+    def _write_atomic(path, data):
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def stats(self):
+        with self._lock:
+            total = self.mem_hits + self.disk_hits + self.misses
+            return {
+                "mem_hits": self.mem_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.mem_hits + self.disk_hits) / total if total else 0.0,
+                "time_saved_s": self.time_saved,
+                "synth_time_s": self.synth_time,
+                "mem_entries": len(self._items),
+                "mem_bytes": self._bytes,
+            }
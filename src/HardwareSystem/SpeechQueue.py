@@ -0,0 +1,80 @@
+import heapq
+import itertools
+import threading
+import time
+
+# 발화 우선순위 (값이 작을수록 먼저)
+PRIORITY_CRITICAL = 0   # 위험/근접 경고: 재생 중인 덜 급한 발화를 끊고 대기열 맨 앞으로
+PRIORITY_NORMAL = 1     # C 서버 답변 등 일반 안내
+PRIORITY_INFO = 2       # 상태 안내: 대기열이 차면 가장 먼저 버림
+PRIORITY_NAMES = {PRIORITY_CRITICAL: "critical", PRIORITY_NORMAL: "normal", PRIORITY_INFO: "info"}
+
+
+class SpeechQueue:
+    """
+    발화 대기열: 우선순위 순(같은 우선순위는 FIFO) + 대기 중인 같은 문장 병합.
+    - 같은 (text, slow)가 이미 대기 중이면 새로 넣지 않고, 더 급한 요청이면 우선순위만 올림
+    - 가득 차면 가장 덜 급한 항목 중 가장 오래된 것을 버림 (새 항목이 그보다 덜 급하면 새 항목을 버림)
+    """
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self._heap = []             # [priority, order(힙 순서), key, ts, alive, arrival(도착 순서)]
+        self._pending = {}          # (text, slow) → heap 항목
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+        # 계측
+        self.coalesced = 0
+        self.dropped = {name: 0 for name in PRIORITY_NAMES.values()}
+
+    def put(self, text, slow, priority, ts=None, front=False):
+        """front=True면 같은 우선순위 안에서 맨 앞에 넣음 (끊긴 발화 되돌리기용)"""
+        key = (text, slow)
+        with self._cond:
+            entry = self._pending.get(key)
+            if entry is not None:
+                self.coalesced += 1
+                if priority < entry[0]:
+                    # 우선순위만 올려 다시 넣음 (대기 시간은 처음 요청 기준 유지)
+                    entry[4] = False
+                    self._push(key, priority, entry[3], front, arrival=entry[5])
+                return True
+            if len(self._pending) >= self.maxsize:
+                # 버릴 항목은 힙 순서가 아니라 도착 순서로 고름 (front로 되돌린 발화가 '가장 오래된' 것으로 잡히지 않게)
+                victim = max(self._pending.values(), key=lambda e: (e[0], -e[5]))
+                if victim[0] < priority:
+                    self.dropped[PRIORITY_NAMES[priority]] += 1
+                    return False
+                victim[4] = False
+                del self._pending[victim[2]]
+                self.dropped[PRIORITY_NAMES[victim[0]]] += 1
+            self._push(key, priority, time.time() if ts is None else ts, front)
+            self._cond.notify()
+            return True
+
+    def _push(self, key, priority, ts, front=False, arrival=None):
+        seq = next(self._seq)
+        entry = [priority, -seq if front else seq, key, ts, True, seq if arrival is None else arrival]
+        self._pending[key] = entry
+        heapq.heappush(self._heap, entry)
+
+    def get(self, timeout=None):
+        """(text, slow, priority, 넣은 시각). timeout 안에 없으면 None"""
+        with self._cond:
+            if not self._pending:
+                self._cond.wait(timeout)
+            while self._heap:
+                priority, _, key, ts, alive, _ = heapq.heappop(self._heap)
+                if alive:
+                    del self._pending[key]
+                    return key[0], key[1], priority, ts
+            return None
+
+    def clear(self):
+        with self._cond:
+            self._heap.clear()
+            self._pending.clear()
+
+    def qsize(self):
+        with self._cond:
+            return len(self._pending)
@@ -1,32 +1,171 @@
-import sys
+import os
+import re
 import io
 import queue
+import shutil
+import subprocess
 import threading
 import time
+from collections import OrderedDict
 import pygame
-from gtts import gTTS  # ← 수정: Stt가 아니라 gtts 모듈에서 import
 from BaseApp import BaseApp
+from Metrics import LatencyHistogram
+from SpeechCache import SpeechCache
+from SpeechQueue import SpeechQueue, PRIORITY_CRITICAL, PRIORITY_NORMAL, PRIORITY_INFO, PRIORITY_NAMES
+
+try:
+    from gtts import gTTS  # ← 수정: Stt가 아니라 gtts 모듈에서 import
+except ImportError:  # 로컬 엔진만 쓰면 없어도 됨
+    gTTS = None
+
+
+class GttsBackend:
+    """Google TTS (네트워크 필요, 음질 좋음) → mp3 바이트"""
+    name = "gtts"
+    format = "mp3"
+
+    def __init__(self):
+        if gTTS is None:
+            raise RuntimeError("gTTS가 설치되지 않았습니다 (pip install gTTS)")
+
+    def synthesize(self, text, language, slow):
+        mp3_fp = io.BytesIO()
+        gTTS(text=text, lang=language, slow=slow).write_to_fp(mp3_fp)
+        return mp3_fp.getvalue()
+
+
+class EspeakBackend:
+    """espeak-ng (완전 로컬, 음질은 낮지만 네트워크 없이 수십 ms 안에 합성) → wav 바이트"""
+    name = "espeak"
+    format = "wav"
+
+    def __init__(self, executable=None, speed=170, slow_speed=120, timeout=30):
+        self.executable = executable or shutil.which("espeak-ng") or shutil.which("espeak")
+        if not self.executable:
+            raise RuntimeError("espeak-ng가 설치되지 않았습니다 (apt install espeak-ng)")
+        self.speed = speed
+        self.slow_speed = slow_speed
+        self.timeout = timeout
+
+    def synthesize(self, text, language, slow):
+        # 텍스트는 stdin(UTF-8)으로 넘김 ('-'로 시작하는 문장이 옵션으로 해석되지 않도록)
+        cmd = [self.executable, "-v", language, "-s", str(self.slow_speed if slow else self.speed),
+               "-b", "1", "--stdout"]
+        out = subprocess.run(cmd, input=text.encode("utf-8"), capture_output=True,
+                             timeout=self.timeout, check=True)
+        return out.stdout
+
+
+# 선택 가능한 합성 엔진 (이름 → 클래스)
+TTS_BACKENDS = {
+    "gtts": GttsBackend,
+    "espeak": EspeakBackend,
+}
+
+
+def load_tts_backend(name, **kwargs):
+    if name not in TTS_BACKENDS:
+        raise ValueError(f"알 수 없는 TTS 백엔드: {name} (가능: {', '.join(TTS_BACKENDS)})")
+    return TTS_BACKENDS[name](**kwargs)
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?。…])\s+|\n+")
+
+
+def split_sentences(text, min_chars=8):
+    """문장 단위로 나눔. min_chars보다 짧은 조각은 앞 문장에 붙여 끊김을 줄임"""
+    chunks = []
+    for part in _SENTENCE_END.split(text):
+        part = part.strip()
+        if not part:
+            continue
+        if chunks and len(chunks[-1]) < min_chars:
+            chunks[-1] = f"{chunks[-1]} {part}"
+        else:
+            chunks.append(part)
+    return chunks
+
+
+class _Utterance:
+    """대기열에서 꺼낸 발화 1건 (합성 단계 → 재생 단계로 문장 단위로 넘어감)"""
+    __slots__ = ("text", "slow", "priority", "ts", "chunks", "next", "cancelled", "t_start")
+
+    def __init__(self, text, slow, priority, ts):
+        self.text = text
+        self.slow = slow
+        self.priority = priority
+        self.ts = ts                    # process()로 들어온 시각
+        self.chunks = split_sentences(text)
+        self.next = 0                   # 다음에 재생할 문장 번호
+        self.cancelled = False          # 긴급 발화로 끊김
+        self.t_start = time.perf_counter()
+
 
 class TextToSpeechApp(BaseApp):
     """
-    안전한 TTS: 인스턴스 1 + 워커 스레드 1 + 큐
-    - process(text): 비블로킹, 텍스트를 큐에 넣기만 함.
-    - 내부 워커가 gTTS 합성(mp3) → pygame.mixer 재생을 순차 처리.
+    안전한 TTS: 인스턴스 1 + 우선순위 큐(SpeechQueue) + 합성 스레드 1 + 재생 스레드 1
+    - process(text, priority=...): 비블로킹, 텍스트를 큐에 넣기만 함.
+      PRIORITY_CRITICAL은 재생/합성 중인 덜 급한 발화를 끊고 먼저 재생 (끊긴 발화의 남은 문장은 다시 대기열로).
+    - 합성 스레드: 큐에서 꺼내 문장 단위로 합성 → PCM으로 한 번 디코드(pygame.mixer.Sound) → 재생 큐
+      재생 스레드: 전용 채널에서 재생. 재생 중에 다음 문장/다음 발화를 합성해 두므로 발화 사이 공백이 짧음.
+    - 합성 엔진은 backend(기본 env TTS_BACKEND 또는 gtts)를 쓰고, 실패하면 fallback(로컬 엔진)으로 대체.
+    - 합성 결과는 SpeechCache(메모리 LRU + 디스크)에 엔진별로 저장해 같은 문장은 다시 합성하지 않음.
+      디코드한 Sound도 최근 sound_cache_size개를 보관해 반복 알림은 디코드도 생략.
     - pygame 전역 리소스는 1회 초기화/정리.
     """
-    def __init__(self, language='ko', frequency=22050, size=-16, channels=2, buffer=512, queue_size=64):
+    BACKEND_RETRY_S = 30.0      # 실패한 엔진은 이 시간 동안 건너뜀 (오프라인에서 매 문장 네트워크 대기 방지)
+    PLAY_AHEAD = 2              # 재생 큐에 미리 준비해 둘 문장 수 (너무 많으면 우선순위 변경에 늦게 반응)
+
+    # 반복해서 나오는 고정 알림 문구: initialize() 때 미리 합성해 둠
+    PRESYNTH_PHRASES = [
+        "위험한 상황이 감지되었습니다. 주의하세요.",
+        "3초 뒤에 말을 해주세요",
+    ]
+
+    def __init__(self, language='ko', frequency=22050, size=-16, channels=2, buffer=512, queue_size=64,
+                 cache=None, backend=None, fallback="espeak", sound_cache_size=32):
         super().__init__(language=language)
         self.frequency = frequency
         self.size = size
         self.channels = channels
         self.buffer = buffer
 
-        self._q = queue.Queue(maxsize=queue_size)
+        self._q = SpeechQueue(maxsize=queue_size)
+        self._play_q = queue.Queue(maxsize=self.PLAY_AHEAD)
         self._stop = threading.Event()
-        self._worker = None
+        self._synth_worker = None
+        self._play_worker = None
         self._lock = threading.Lock()
         self._pygame_ok = False
+        self._channel = None
+        self._play_done = threading.Event()     # 재생 끝(소리 길이 경과) 또는 중단 시 set
+        self._active = []                       # 대기열에서 꺼냈지만 아직 재생이 끝나지 않은 발화 (꺼낸 순서)
+        self._playing = None                    # 지금 채널에서 재생 중인 발화
         self._slow = False  # gTTS 속도 옵션
+        self.cache = cache if cache is not None else SpeechCache()
+        self._sounds = OrderedDict()            # (엔진, 문장, slow) → 디코드된 pygame.mixer.Sound
+        self.sound_cache_size = sound_cache_size
+
+        # 합성 엔진: 주 엔진 + (있으면) 로컬 대체 엔진
+        self.backends = []
+        for name in dict.fromkeys(n for n in (backend or os.environ.get("TTS_BACKEND", "gtts"), fallback) if n):
+            try:
+                self.backends.append(load_tts_backend(name))
+            except Exception as e:
+                print(f"[TTS] {name} 엔진 사용 불가: {e}")
+        self._backend_down = {}     # 엔진 이름 → 다시 시도할 시각
+
+        # 계측: 우선순위별 대기열 대기 시간, 끊은 횟수,
+        #       엔진별 첫 소리까지 시간(큐에서 꺼낸 뒤 첫 문장 재생 시작까지), 엔진 실패 횟수,
+        #       발화 사이 / 문장 사이 공백 (앞 소리가 끝났을 때 다음 것이 이미 요청돼 있던 경우만)
+        self.queue_wait = {name: LatencyHistogram() for name in PRIORITY_NAMES.values()}
+        self.preemptions = 0
+        self.first_audio = {b.name: LatencyHistogram() for b in self.backends}
+        self.backend_failures = {b.name: 0 for b in self.backends}
+        self.utterance_gap = LatencyHistogram()
+        self.sentence_gap = LatencyHistogram()
+        self.decode_time = LatencyHistogram()
+        self._last_end = None
 
     def initialize(self):
         with self._lock:
@@ -41,6 +180,9 @@ class TextToSpeechApp(BaseApp):
                     buffer=self.buffer
                 )
                 pygame.mixer.init()
+                # 채널 0은 음성 전용 (다른 Sound.play()가 자동 할당으로 가져가지 않도록 예약)
+                pygame.mixer.set_reserved(1)
+                self._channel = pygame.mixer.Channel(0)
                 self._pygame_ok = True
             except Exception as e:
                 print(f"[TTS] pygame 초기화 오류: {e}")
@@ -48,18 +190,71 @@ class TextToSpeechApp(BaseApp):
                 # pygame이 실패해도 워커는 띄우지 않음
                 return
 
-            # 워커 시작
-            self._worker = threading.Thread(target=self._loop, name="TTSWorker", daemon=True)
-            self._worker.start()
+            # 워커 시작 (합성 / 재생)
+            self._synth_worker = threading.Thread(target=self._synth_loop, name="TTSSynth", daemon=True)
+            self._play_worker = threading.Thread(target=self._play_loop, name="TTSPlayer", daemon=True)
+            self._synth_worker.start()
+            self._play_worker.start()
+
+            # 고정 문구 미리 합성 (네트워크 대기로 초기화가 늦어지지 않도록 별도 스레드)
+            threading.Thread(target=self.presynthesize, name="TTSPresynth", daemon=True).start()
 
             self.initialized = True
             print("[TTS] 초기화 완료, 워커 스레드 시작.")
 
+    def presynthesize(self, phrases=None, slow=None):
+        """문구들을 미리 합성·디코드해 캐시에 채움 (이미 디스크에 있으면 메모리로만 올림)"""
+        slow = self._slow if slow is None else bool(slow)
+        for text in phrases or self.PRESYNTH_PHRASES:
+            # 재생 때와 같은 문장 단위로 합성해야 캐시 키가 맞음
+            for chunk in split_sentences(text):
+                try:
+                    self._render(chunk, slow)
+                except Exception as e:
+                    print(f"[TTS] 사전 합성 오류: {e} (텍스트: {chunk[:40]!r})")
+
+    def _synthesize(self, text, slow):
+        """(오디오 바이트, 포맷, 엔진 이름). 캐시 우선, 없으면 쓸 수 있는 첫 엔진으로 합성"""
+        last_error = RuntimeError("사용 가능한 TTS 엔진이 없습니다")
+        for backend in self.backends:
+            if time.monotonic() < self._backend_down.get(backend.name, 0.0):
+                continue
+            try:
+                audio = self.cache.get_or_synthesize(
+                    text, self.language, slow,
+                    lambda: backend.synthesize(text, self.language, slow), engine=backend.name)
+                self._backend_down.pop(backend.name, None)
+                return audio, backend.format, backend.name
+            except Exception as e:
+                print(f"[TTS] {backend.name} 합성 실패: {e}")
+                self.backend_failures[backend.name] += 1
+                self._backend_down[backend.name] = time.monotonic() + self.BACKEND_RETRY_S
+                last_error = e
+        raise last_error
+
+    def _render(self, text, slow):
+        """(디코드된 Sound, 엔진 이름). mp3/wav는 여기서 한 번만 PCM으로 디코드"""
+        audio, _, engine = self._synthesize(text, slow)
+        key = (engine, text, slow)
+        with self._lock:
+            sound = self._sounds.get(key)
+            if sound is not None:
+                self._sounds.move_to_end(key)
+                return sound, engine
+        t0 = time.perf_counter()
+        sound = pygame.mixer.Sound(file=io.BytesIO(audio))
+        self.decode_time.add(time.perf_counter() - t0)
+        with self._lock:
+            self._sounds[key] = sound
+            while len(self._sounds) > self.sound_cache_size:
+                self._sounds.popitem(last=False)
+        return sound, engine
+
     def set_slow(self, slow: bool):
         """gTTS 합성 속도 설정 (True: 느리게)"""
         self._slow = bool(slow)
 
-    def process(self, text: str, slow: bool | None = None) -> bool:
+    def process(self, text: str, slow: bool | None = None, priority: int = PRIORITY_NORMAL) -> bool:
         if not text or not text.strip():
             return False
         if not self.initialized:
@@ -68,87 +263,153 @@ class TextToSpeechApp(BaseApp):
             if not self.initialized:
                 return False
 
-        payload = (text.strip(), self._slow if slow is None else bool(slow))
-        try:
-            self._q.put_nowait(payload)
-            return True
-        except queue.Full:
-            # 백프레셔 정책: 가장 오래된 것 drop 후 push
-            try:
-                _ = self._q.get_nowait()
-            except queue.Empty:
-                pass
-            try:
-                self._q.put_nowait(payload)
-                return True
-            except queue.Full:
-                return False
+        if not self._q.put(text.strip(), self._slow if slow is None else bool(slow), priority):
+            return False
+        if priority == PRIORITY_CRITICAL:
+            self._preempt(priority)
+        return True
+
+    def _preempt(self, priority):
+        """priority보다 덜 급한 재생/합성 중 발화를 끊고, 남은 문장을 대기열 앞쪽에 되돌림"""
+        with self._lock:
+            victims = [utt for utt in self._active if utt.priority > priority]
+            if not victims:
+                return
+            self.preemptions += 1
+            # 나중에 꺼낸 발화부터 앞쪽에 넣어, 결국 원래 순서대로 대기열 맨 앞에 놓이게 함
+            for utt in reversed(victims):
+                utt.cancelled = True
+                self._active.remove(utt)
+                rest = utt.chunks[utt.next:]
+                if rest and utt.priority < PRIORITY_INFO:       # 상태 안내는 버림
+                    print(f"[TTS] 긴급 발화로 중단, 남은 문장 다시 대기: {rest[0][:40]!r}")
+                    self._q.put(" ".join(rest), utt.slow, utt.priority, ts=utt.ts, front=True)
+            # 지금 재생 중인 발화가 끊긴 경우에만 재생을 깨움 (잠금 안에서 set해야 다음 문장을 잘못 끊지 않음)
+            if self._playing in victims:
+                self._play_done.set()
 
     def flush(self):
         """대기열 비우기(재생 중인 항목은 건드리지 않음)"""
-        try:
-            while True:
-                self._q.get_nowait()
-        except queue.Empty:
-            pass
+        self._q.clear()
 
     def stop(self):
-        """현재 재생 중지(대기열은 유지)"""
-        if self._pygame_ok:
+        """현재 문장 재생 중지(대기열은 유지)"""
+        if self._pygame_ok and self._channel is not None:
             try:
-                if pygame.mixer.music.get_busy():
-                    pygame.mixer.music.stop()
+                self._channel.stop()
             except Exception as e:
                 print(f"[TTS] stop 오류: {e}")
-    
-    def _loop(self):
-        """워커: 큐에서 꺼내 순차 합성/재생"""
+        self._play_done.set()
+
+    def _synth_loop(self):
+        """합성 단계: 큐에서 꺼내 문장 단위로 합성·디코드해 재생 큐로 (재생 큐가 차면 대기)"""
         while not self._stop.is_set():
-            try:
-                text, slow = self._q.get(timeout=0.5)
-            except queue.Empty:
+            item = self._q.get(timeout=0.5)
+            if item is None:
                 continue
+            text, slow, priority, ts = item
+            self.queue_wait[PRIORITY_NAMES[priority]].add(time.time() - ts)
+            utt = _Utterance(text, slow, priority, ts)
+            with self._lock:
+                self._active.append(utt)
+            for i, chunk in enumerate(utt.chunks):
+                if utt.cancelled or self._stop.is_set():
+                    break
+                try:
+                    sound, engine = self._render(chunk, slow)
+                except Exception as e:
+                    print(f"[TTS] 합성 오류: {e} (텍스트: {chunk[:40]!r}...)")
+                    sound, engine = None, None
+                self._put_play((utt, i, sound, engine))
 
-            # 1) gTTS 합성(mp3 메모리)
-            mp3_fp = io.BytesIO()
+    def _put_play(self, segment):
+        utt = segment[0]
+        while not utt.cancelled and not self._stop.is_set():
             try:
-                t0 = time.time()
-                tts = gTTS(text=text, lang=self.language, slow=slow)
-                tts.write_to_fp(mp3_fp)
-                mp3_fp.seek(0)
-                synth_dur = time.time() - t0
-            except Exception as e:
-                print(f"[TTS] 합성 오류: {e} (텍스트: {text[:40]!r}...)")
+                self._play_q.put(segment, timeout=0.2)
+                return
+            except queue.Full:
                 continue
 
-            # 2) pygame 재생(단일 워커이므로 자연스럽게 직렬화)
-            if not self._pygame_ok:
-                print("[TTS] pygame 사용 불가 상태. 합성 결과는 재생하지 않습니다.")
+    def _play_loop(self):
+        """재생 단계: 전용 채널에서 Sound 재생, 끝은 소리 길이만큼 Event 대기로 판단 (폴링 없음)"""
+        while not self._stop.is_set():
+            try:
+                utt, i, sound, engine = self._play_q.get(timeout=0.5)
+            except queue.Empty:
                 continue
+            # 먼저 clear 한 뒤 cancelled를 확인해야 그 사이의 _preempt()를 놓치지 않음
+            self._play_done.clear()
+            with self._lock:
+                if utt.cancelled:
+                    continue
+                self._playing = utt
+            if sound is not None:
+                try:
+                    self._play(utt, i, sound, engine)
+                except Exception as e:
+                    print(f"[TTS] 재생 오류: {e}")
+            with self._lock:
+                self._playing = None
+                if not utt.cancelled:
+                    utt.next = i + 1
+                    if utt.next >= len(utt.chunks):
+                        self._active.remove(utt)
 
-            try:
-                pygame.mixer.music.load(mp3_fp, "mp3")
-                pygame.mixer.music.play()
-                # 바쁘게 도는 루프 대신 짧게 sleep
-                while pygame.mixer.music.get_busy() and not self._stop.is_set():
-                    time.sleep(0.05)
-            except Exception as e:
-                print(f"[TTS] 재생 오류: {e}")
+    def _play(self, utt, i, sound, engine):
+        now = time.time()
+        if self._last_end is not None:
+            if i > 0:
+                self.sentence_gap.add(now - self._last_end)
+            elif utt.ts <= self._last_end:
+                self.utterance_gap.add(now - self._last_end)
+        self._channel.play(sound)
+        if i == 0:
+            self.first_audio[engine].add(time.perf_counter() - utt.t_start)
+
+        # pygame 끝 이벤트(set_endevent)는 event/video 서브시스템이 필요해 헤드리스 장치에서 못 씀
+        # → 디코드된 PCM 길이만큼 Event를 기다림. 중단(_preempt/stop)이면 즉시 깨어남
+        self._play_done.wait(sound.get_length())
+        if self._play_done.is_set() or self._stop.is_set():
+            self._channel.stop()
+        elif self._channel.get_busy():
+            # 믹서 버퍼에 남은 마지막 조각만큼 한 번 더 기다림
+            self._play_done.wait(2 * self.buffer / self.frequency)
+        self._last_end = time.time()
+
+    def stats(self):
+        return {
+            "queue_depth": self._q.qsize(),
+            "queue_wait_ms": {name: h.snapshot() for name, h in self.queue_wait.items()},
+            "coalesced": self._q.coalesced,
+            "dropped": dict(self._q.dropped),
+            "preemptions": self.preemptions,
+            "backends": [b.name for b in self.backends],
+            "backend_failures": dict(self.backend_failures),
+            "first_audio_ms": {name: h.snapshot() for name, h in self.first_audio.items()},
+            "utterance_gap_ms": self.utterance_gap.snapshot(),
+            "sentence_gap_ms": self.sentence_gap.snapshot(),
+            "decode_ms": self.decode_time.snapshot(),
+            "cache": self.cache.stats(),
+        }
 
     def cleanup(self):
         """워커 종료 및 pygame 정리"""
+        self._stop.set()
+        self._play_done.set()
+        # 워커가 _lock을 잡으므로 join은 잠금 밖에서
+        for worker in (self._synth_worker, self._play_worker):
+            if worker:
+                worker.join(timeout=2.0)
         with self._lock:
-            self._stop.set()
-            if self._worker:
-                self._worker.join(timeout=2.0)
-                self._worker = None
+            self._synth_worker = self._play_worker = None
             if self._pygame_ok:
                 try:
-                    if pygame.mixer.music.get_busy():
-                        pygame.mixer.music.stop()
+                    pygame.mixer.stop()
                     pygame.mixer.quit()
                 except Exception as e:
                     print(f"[TTS] 정리 오류: {e}")
                 self._pygame_ok = False
+            self._sounds.clear()
             self.initialized = False
             print("[TTS] 정리 완료.")
@@ -0,0 +1,311 @@
+import os
+import json
+import time
+import queue
+import threading
+import numpy as np
+import speech_recognition as sr
+from Metrics import LatencyHistogram
+
+DEFAULT_STATE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "4youreyes", "stt", "noise_floor.json")
+
+
+class AudioRing:
+    """고정 크기 오디오 프레임 링 버퍼 (쓰는 쪽 1개, 읽는 쪽은 각자 읽을 위치를 들고 다님)"""
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._frames = [None] * capacity
+        self._times = [0.0] * capacity
+        self.written = 0                # 지금까지 쓴 프레임 수 (다음 쓸 위치)
+        self._cond = threading.Condition()
+
+    def push(self, frame, t):
+        with self._cond:
+            i = self.written % self.capacity
+            self._frames[i] = frame
+            self._times[i] = t
+            self.written += 1
+            self._cond.notify_all()
+
+    def read(self, pos, timeout=None):
+        """
+        pos번째 프레임 → (frame, 프레임 끝 시각, 실제 위치). 아직 없으면 timeout 동안 기다리고 None.
+        읽는 쪽이 밀려 덮어써졌으면 남아 있는 가장 오래된 프레임을 돌려줌 (실제 위치 > pos).
+        """
+        with self._cond:
+            if pos >= self.written:
+                self._cond.wait(timeout)
+                if pos >= self.written:
+                    return None
+            pos = max(pos, self.written - self.capacity)
+            i = pos % self.capacity
+            return self._frames[i], self._times[i], pos
+
+
+class EnergySegmenter:
+    """
+    에너지(RMS) 기반 발화 구간 검출.
+    - 잡음 바닥(noise_floor): 발화가 아닌 프레임의 RMS를 EWMA로 계속 추적 (처음 값이 없으면 calibrate_s 동안 평균)
+    - 임계값 = max(min_energy, noise_floor * ratio). start_frames 연속으로 넘으면 발화 시작
+    - end_silence_s 동안 조용하면(또는 max_phrase_s에 도달하면) 발화 끝 → 앞 pre_roll_s 포함 오디오 반환
+    프레임 시각은 프레임 끝 시각(캡처 완료 시각).
+    """
+    def __init__(self, frame_s, noise_floor=None, ratio=2.5, min_energy=100.0, alpha=0.05,
+                 start_frames=3, end_silence_s=0.5, pre_roll_s=0.3, max_phrase_s=8.0, calibrate_s=0.5):
+        self.frame_s = frame_s
+        self.noise_floor = noise_floor
+        self.ratio = ratio
+        self.min_energy = min_energy
+        self.alpha = alpha
+        self.start_frames = start_frames
+        self.end_frames = max(1, round(end_silence_s / frame_s))
+        self.pre_roll = max(1, round(pre_roll_s / frame_s))
+        self.max_frames = round(max_phrase_s / frame_s)
+        self.calibrate_frames = round(calibrate_s / frame_s)
+        self.reset()
+
+    def reset(self):
+        """진행 중인 발화만 버림 (잡음 바닥은 유지)"""
+        self._pre = []                  # 발화 전 프레임 (pre_roll + 시작 판정 중인 프레임)
+        self._voiced_run = 0
+        self._speech = None             # 발화 중이면 프레임 목록
+        self._silence = 0
+        self._speech_start = 0.0        # 발화 오디오(pre_roll 포함) 시작 시각
+        self._speech_end = 0.0          # 마지막 유성 프레임 끝 시각
+        self._calib = []
+
+    @property
+    def threshold(self):
+        return max(self.min_energy, (self.noise_floor or 0.0) * self.ratio)
+
+    def feed(self, frame, t):
+        """프레임 1개 처리. 발화가 끝났으면 (오디오 bytes, 시작 시각, 발화 끝 시각), 아니면 None"""
+        energy = float(np.sqrt(np.mean(np.frombuffer(frame, dtype=np.int16).astype(np.float32) ** 2)))
+        if self.noise_floor is None:
+            self._calib.append(energy)
+            if len(self._calib) >= self.calibrate_frames:
+                self.noise_floor = float(np.mean(self._calib))
+                self._calib = []
+            return None
+
+        voiced = energy > self.threshold
+        if self._speech is None:
+            self._pre.append(frame)
+            if voiced:
+                self._voiced_run += 1
+                self._speech_end = t
+                if self._voiced_run >= self.start_frames:
+                    self._speech = self._pre
+                    self._pre = []
+                    self._speech_start = t - len(self._speech) * self.frame_s
+                    self._silence = 0
+            else:
+                self._voiced_run = 0
+                self.noise_floor += self.alpha * (energy - self.noise_floor)
+                del self._pre[:-self.pre_roll]
+            return None
+
+        self._speech.append(frame)
+        if voiced:
+            self._silence = 0
+            self._speech_end = t
+        else:
+            self._silence += 1
+        if self._silence >= self.end_frames or len(self._speech) >= self.max_frames:
+            return self._emit()
+        return None
+
+    def flush(self):
+        """입력이 끝났을 때 진행 중인 발화를 바로 마감해 반환 (없으면 None)"""
+        if self._speech is None:
+            return None
+        return self._emit()
+
+    def _emit(self):
+        audio = b"".join(self._speech)
+        self._speech = None
+        self._voiced_run = 0
+        return audio, self._speech_start, self._speech_end
+
+
+class VoiceListener:
+    """
+    연속 음성 입력: 캡처 스레드 → AudioRing → 구간 검출 스레드 → 인식 스레드
+    - 캡처는 인식과 무관하게 계속 돌아, 인식(recognize_google)을 기다리는 동안 말한 내용도 잃지 않음
+    - 말이 끝나면(end_silence_s) 바로 그 구간만 인식 큐로 넘김
+    - 잡음 바닥은 세션(start/stop)을 넘어 유지하고 state_path에 저장해 재시작 후에도 다시 보정하지 않음
+    - holdoff_s: 세션 시작 후 이 시간 안에 시작한 발화는 버림 (안내 멘트가 마이크로 들어오는 것 방지)
+    - stop(): 캡처만 멈추고, 링에 남은 프레임과 말하던 중인 발화까지 마감해 인식한 뒤 스레드가 끝남
+    인식 결과는 on_text(text)로 전달.
+    """
+    def __init__(self, recognizer, language, on_text, sample_rate=16000, frame_s=0.03, ring_s=10.0,
+                 holdoff_s=0.0, state_path=DEFAULT_STATE_PATH, **segmenter_kwargs):
+        self.recognizer = recognizer
+        self.language = language
+        self.on_text = on_text
+        self.sample_rate = sample_rate
+        self.chunk = int(sample_rate * frame_s)
+        self.holdoff_s = holdoff_s
+        self.state_path = state_path
+        self.ring = AudioRing(int(ring_s / frame_s))
+        self.segmenter = EnergySegmenter(frame_s, noise_floor=self._load_floor(), **segmenter_kwargs)
+        self._utterances = queue.Queue(maxsize=4)
+        self._stop = threading.Event()             # 캡처 중지 요청
+        self._capture_done = threading.Event()
+        self._segment_done = threading.Event()
+        self._threads = []
+        self._sample_width = 2
+        self._session_start = 0.0
+
+        # 계측
+        self.end_to_text = LatencyHistogram()       # 발화 끝(마지막 유성 프레임) → 인식 텍스트
+        self.recognize_time = LatencyHistogram()
+        self.utterances = 0
+        self.recognized = 0
+        self.dropped = 0                            # 인식 큐가 가득 차 버린 발화
+        self.overruns = 0                           # 구간 검출이 밀려 링에서 덮어써진 프레임
+
+    def _load_floor(self):
+        if not self.state_path:
+            return None
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+            return float(state["noise_floor"]) if state.get("sample_rate") == self.sample_rate else None
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save_floor(self):
+        if not self.state_path or self.segmenter.noise_floor is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            tmp = f"{self.state_path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"noise_floor": self.segmenter.noise_floor, "sample_rate": self.sample_rate}, f)
+            os.replace(tmp, self.state_path)
+        except OSError as e:
+            print(f"[STT] 잡음 바닥 저장 오류: {e}")
+
+    def start(self, timeout=2.0):
+        """세션 시작. 이전 세션 스레드(주로 인식 대기)가 timeout 안에 끝나지 않으면 시작하지 않고 False"""
+        for t in self._threads:
+            t.join(timeout=timeout)
+        if any(t.is_alive() for t in self._threads):
+            print("⚠️ 이전 음성 인식이 아직 끝나지 않아 녹음을 시작하지 않습니다.")
+            return False
+        # 이전 세션에서 남은 발화가 새 명령으로 인식되지 않도록 비움
+        while True:
+            try:
+                self._utterances.get_nowait()
+            except queue.Empty:
+                break
+        self._stop.clear()
+        self._capture_done.clear()
+        self._segment_done.clear()
+        self.segmenter.reset()
+        self._session_start = time.time()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="SttCapture", daemon=True),
+            threading.Thread(target=self._segment_loop, name="SttSegment", daemon=True),
+            threading.Thread(target=self._recognize_loop, name="SttRecognize", daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+        return True
+
+    def stop(self, timeout=2.0):
+        """
+        캡처를 멈추고 남은 발화 인식까지 최대 timeout 기다림.
+        인식(recognize_google)이 더 걸리면 그 스레드는 끝까지 돌아 결과를 on_text로 전달하고,
+        그동안 start()는 거부됨.
+        """
+        self._stop.set()
+        deadline = time.monotonic() + timeout
+        for t in self._threads:
+            t.join(timeout=max(0.0, deadline - time.monotonic()))
+        self._save_floor()
+
+    def _capture_loop(self):
+        try:
+            with sr.Microphone(sample_rate=self.sample_rate, chunk_size=self.chunk) as source:
+                self._sample_width = source.SAMPLE_WIDTH
+                print("🎤 (백그라운드) 음성 캡처 시작. 입력을 기다립니다...")
+                while not self._stop.is_set():
+                    self.ring.push(source.stream.read(source.CHUNK), time.time())
+        except Exception as e:
+            print(f"🔥 마이크 캡처 오류: {e}")
+            self._stop.set()
+        finally:
+            self._capture_done.set()
+
+    def _segment_loop(self):
+        pos = self.ring.written
+        try:
+            while True:
+                item = self.ring.read(pos, timeout=0.1)
+                if item is None:
+                    # 캡처가 끝났고 링에 남은 프레임도 다 읽었으면 종료
+                    if self._capture_done.is_set() and pos >= self.ring.written:
+                        break
+                    continue
+                frame, t, actual = item
+                if actual > pos:
+                    self.overruns += actual - pos
+                pos = actual + 1
+                self._submit(self.segmenter.feed(frame, t))
+            # 녹음을 끄는 순간 말하던 발화도 인식 (보통 말을 마치자마자 끔)
+            self._submit(self.segmenter.flush())
+        finally:
+            self._segment_done.set()
+            self._utterances.put(None)      # 인식 스레드 종료 표시
+
+    def _submit(self, result):
+        if result is None:
+            return
+        audio, start, speech_end = result
+        if start < self._session_start + self.holdoff_s:
+            return
+        self.utterances += 1
+        try:
+            self._utterances.put_nowait((sr.AudioData(audio, self.sample_rate, self._sample_width), speech_end))
+        except queue.Full:
+            self.dropped += 1
+
+    def _recognize_loop(self):
+        """구간 검출이 끝난 뒤에도 큐에 남은 발화를 모두 인식하고 종료"""
+        while True:
+            try:
+                item = self._utterances.get(timeout=0.5)
+            except queue.Empty:
+                if self._segment_done.is_set():
+                    break
+                continue
+            if item is None:
+                break
+            audio, speech_end = item
+            t0 = time.perf_counter()
+            try:
+                text = self.recognizer.recognize_google(audio, language=self.language)
+            except sr.UnknownValueError:
+                text = None
+            except Exception as e:
+                print(f"🔥 음성 인식 오류: {e}")
+                text = None
+            self.recognize_time.add(time.perf_counter() - t0)
+            if text:
+                self.recognized += 1
+                self.end_to_text.add(time.time() - speech_end)
+                self.on_text(text)
+
+    def stats(self):
+        return {
+            "noise_floor": self.segmenter.noise_floor,
+            "threshold": self.segmenter.threshold,
+            "utterances": self.utterances,
+            "recognized": self.recognized,
+            "dropped": self.dropped,
+            "overruns": self.overruns,
+            "end_to_text_ms": self.end_to_text.snapshot(),
+            "recognize_ms": self.recognize_time.snapshot(),
+        }
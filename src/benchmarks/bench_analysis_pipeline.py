@@ -0,0 +1,203 @@
+"""
+Condition_check 종단 벤치마크 (카메라/Ollama 없이)
+- 카메라: --replay 녹화 파일, 없으면 장면이 scene_s초마다 바뀌는 합성 프레임을 임시 .rsrec로 만들어 ReplayHub로 재생
+- VLM   : fake_ollama.FakeOllama (지연/응답/장애를 인자로 조절, hazard_every번째 응답마다 위험 설명)
+- 스피커: 큐 투입 시각만 기록하는 NullSpeaker (음성 합성/재생 제외)
+NLI 모델은 실제로 로드함 (Llm 그대로 사용).
+
+측정 (p50/p95/p99, 원시 표본 기준):
+- 단계별 처리 시간: encode / vlm / classify(+순서 복원, 다수결)
+- frame→verdict: 프레임 캡처 시각 → 다수결 판정
+- frame→alert  : 프레임 캡처 시각 → 스피커 큐 투입 (위험 판정만)
+- verdict→alert: 판정 → 스피커 큐 투입 (dispatch 경로)
+- 처리량: 초당 판정 수
+
+실행: python src/benchmarks/bench_analysis_pipeline.py [--duration 60] [--latency 2.0] [--concurrency 2]
+"""
+import os
+import sys
+import time
+import json
+import tempfile
+import argparse
+import threading
+from collections import deque
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(HERE, "..")
+for p in (HERE, os.path.join(SRC, "HardwareSystem"), os.path.join(SRC, "system"), SRC):
+    sys.path.insert(0, p)
+from fake_ollama import FakeOllama, DEFAULT_RESPONSES
+
+HAZARD_RESPONSE = "A kitchen with a stove where flames and thick smoke are rising from a burning pan."
+
+
+class NullSpeaker:
+    """TextToSpeechApp 대역: process() 호출 시각만 기록"""
+    def __init__(self):
+        self.enqueued = []
+
+    def process(self, text, slow=False, priority=None):
+        self.enqueued.append((time.time(), text))
+        return True
+
+    def cleanup(self):
+        pass
+
+
+def write_synthetic(path, scenes, scene_s, fps, width, height, seed=0):
+    """장면마다 다른 블록 패턴 + 프레임마다 약한 노이즈 (장면 전환 = 큰 변화)"""
+    from Replay import RecordingWriter
+    rng = np.random.default_rng(seed)
+    header = {"width": width, "height": height, "fps": fps, "depth_scale": None, "depth_intrinsics": None,
+              "has_color": True, "has_depth": False, "aligned": False}
+    w = RecordingWriter(path, header)
+    try:
+        n = int(scene_s * fps)
+        for s in range(scenes):
+            base = rng.integers(0, 255, (12, 16, 3), dtype=np.uint8).repeat(height // 12, 0).repeat(width // 16, 1)
+            base = np.ascontiguousarray(np.resize(base, (height, width, 3)))
+            for i in range(n):
+                noise = rng.integers(-4, 5, base.shape)
+                w.write((s * n + i) / fps, np.clip(base + noise, 0, 255).astype(np.uint8))
+    finally:
+        w.close()
+    return w.frames_written
+
+
+def pct(samples):
+    if not samples:
+        return "      -        -        -   (n=0)"
+    a = np.asarray(samples) * 1e3
+    p50, p95, p99 = np.percentile(a, [50, 95, 99])
+    return f"{p50:8.1f} {p95:8.1f} {p99:8.1f}   (n={a.size})"
+
+
+def timed(fn, samples):
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter() - t0)
+    return wrapper
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--replay", help="녹화 파일 (.rsrec). 없으면 합성 프레임 사용")
+    ap.add_argument("--duration", type=float, default=60.0)
+    ap.add_argument("--scenes", type=int, default=6)
+    ap.add_argument("--scene-s", type=float, default=4.0)
+    ap.add_argument("--fps", type=float, default=4.0)
+    ap.add_argument("--latency", type=float, default=2.0, help="fake VLM 첫 토큰 지연(초)")
+    ap.add_argument("--jitter", type=float, default=0.5)
+    ap.add_argument("--token-delay", type=float, default=0.02)
+    ap.add_argument("--fail-rate", type=float, default=0.0)
+    ap.add_argument("--hang-rate", type=float, default=0.0)
+    ap.add_argument("--hazard-every", type=int, default=3, help="N번째 응답마다 위험 설명 (0이면 없음)")
+    ap.add_argument("--concurrency", type=int, default=2)
+    ap.add_argument("--interval", type=float, default=5.0)
+    ap.add_argument("--min-interval", type=float, default=1.0)
+    ap.add_argument("--no-stream", action="store_true")
+    args = ap.parse_args()
+
+    responses = list(DEFAULT_RESPONSES[:2]) + [DEFAULT_RESPONSES[3]]
+    if args.hazard_every > 0:
+        responses = [HAZARD_RESPONSE if (i + 1) % args.hazard_every == 0 else responses[i % len(responses)]
+                     for i in range(args.hazard_every * len(responses))]
+    fake = FakeOllama(latency=args.latency, jitter=args.jitter, token_delay=args.token_delay,
+                      responses=responses, fail_rate=args.fail_rate, hang_rate=args.hang_rate,
+                      hang_s=args.latency * 10).start()
+    os.environ["OLLAMA_HOST"] = fake.url        # ollama 패키지 import 전에 지정
+
+    tmp = None
+    path = args.replay
+    if path is None:
+        tmp = tempfile.NamedTemporaryFile(suffix=".rsrec", delete=False)
+        tmp.close()
+        path = tmp.name
+        n = write_synthetic(path, args.scenes, args.scene_s, args.fps, 640, 480)
+        print(f"합성 프레임 {n}장 ({args.scenes}장면 x {args.scene_s}s, {args.fps}fps) → {path}")
+
+    from HardwareSystem.HardwareResourceManager import hardware_manager
+    from ConditionCheck import Condition_check
+
+    hardware_manager.use_replay(path, realtime=True)
+    speaker = NullSpeaker()
+    hardware_manager._speaker_instance = speaker
+
+    cc = Condition_check(analysis_interval=args.interval, min_interval=args.min_interval,
+                         max_interval=args.interval * 3, enable_proximity=False,
+                         stream_vlm=not args.no_stream, vlm_concurrency=args.concurrency)
+    cc.VOICE_COOLDOWN = 0.0
+
+    # 단계 함수는 run()에서 파이프라인을 만들 때 참조되므로 그 전에 계측 래퍼로 교체
+    stage_s = {name: [] for name in ("encode", "vlm", "classify")}
+    cc._encode_stage = timed(cc._encode_stage, stage_s["encode"])
+    cc._vlm_stage = timed(cc._vlm_stage, stage_s["vlm"])
+    cc._classify_stage = timed(cc._classify_stage, stage_s["classify"])
+
+    frame_to_verdict, frame_to_alert, verdict_to_alert = [], [], []
+    verdict_frames = deque()                    # result_q와 같은 순서로 프레임 ts 전달
+    orig_vote, orig_dispatch = cc._vote, cc._dispatch
+
+    def vote(job):
+        verdict_frames.append(job.ts)
+        orig_vote(job)
+        frame_to_verdict.append(time.time() - job.ts)
+
+    def dispatch(majority, desc, took, timestamp, hazards):
+        frame_ts = verdict_frames.popleft() if verdict_frames else None
+        before = cc.last_voice_alert
+        orig_dispatch(majority, desc, took, timestamp, hazards)
+        if cc.last_voice_alert != before:
+            now = time.time()
+            verdict_to_alert.append(now - timestamp)
+            if frame_ts is not None:
+                frame_to_alert.append(now - frame_ts)
+
+    cc._vote = vote
+    cc._dispatch = dispatch
+
+    t_run = threading.Thread(target=cc.run, daemon=True)
+    t0 = time.time()
+    t_run.start()
+    try:
+        time.sleep(args.duration)
+    except KeyboardInterrupt:
+        pass
+    cc.stop_flag = True
+    t_run.join(timeout=10.0)
+    elapsed = time.time() - t0
+    hardware_manager.get_camera()._cleanup()
+    fake.stop()
+    if tmp is not None:
+        os.unlink(path)
+
+    stats = cc.stats()
+    verdicts = len(frame_to_verdict)
+    print("\n" + "=" * 72)
+    print(f"{elapsed:.1f}s, VLM {args.latency:.1f}s±{args.jitter:.1f}, 동시 {args.concurrency}, "
+          f"{'non-stream' if args.no_stream else 'stream'}, fail {args.fail_rate:.0%}, hang {args.hang_rate:.0%}")
+    print(f"판정 {verdicts}건 ({verdicts / elapsed:.3f}/s), 음성 알림 {len(speaker.enqueued)}건 "
+          f"(조기 {stats['early_alerts']}건), 장면 게이트 절약 {stats['scene_gate']['vlm_calls_saved']}회")
+    print(f"{'':16}{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, samples in stage_s.items():
+        print(f"{'stage ' + name:<16}{pct(samples)}")
+    print(f"{'frame->verdict':<16}{pct(frame_to_verdict)}")
+    print(f"{'frame->alert':<16}{pct(frame_to_alert)}")
+    print(f"{'verdict->alert':<16}{pct(verdict_to_alert)}")
+    ttfa = stats["time_to_first_alert_ms"]
+    if ttfa["count"]:
+        print(f"{'VLM->1st alert':<16}{ttfa['p50_ms']:8.1f} {ttfa['p95_ms']:8.1f} {ttfa['p99_ms']:8.1f}   "
+              f"(n={ttfa['count']}, 버킷 기준)")
+    print("utilization: " + ", ".join(f"{k} {v['utilization']:.0%}" for k, v in stats["pipeline"].items()))
+    print(f"scheduler: {json.dumps({k: v for k, v in stats['scheduler'].items() if k != 'latency_ms'})}")
+    print(f"fake ollama: {fake.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+RSUtils 깊이→3D 변환 벤치마크 (카메라 없이 합성 depth 사용)
+- pixel : 기존 RSUtils.depth_to_xyz 를 픽셀마다 Python 루프로 호출
+- frame : RSUtils.depth_frame_to_xyz 한 번 호출 (전체 프레임 / mask)
+- roi   : RSUtils.roi_distance_stats (median/percentile/유효비율)
+
+실행: python src/benchmarks/bench_depth_xyz.py [--step 4] [--repeat 20]
+"""
+import os
+import sys
+import time
+import argparse
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "system"))
+from RSUtils import RSUtils
+
+
+def timeit(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--width", type=int, default=640)
+    ap.add_argument("--height", type=int, default=480)
+    ap.add_argument("--step", type=int, default=4, help="픽셀 루프는 step 간격으로만 돌고 전체로 환산")
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    w, h = args.width, args.height
+    intrin = SimpleNamespace(width=w, height=h, fx=385.0, fy=385.0, ppx=w / 2, ppy=h / 2)
+    scale = 0.001
+    rng = np.random.default_rng(0)
+    depth = rng.integers(300, 5000, (h, w), dtype=np.uint16)
+    depth[rng.random((h, w)) < 0.1] = 0           # 10% 측정 실패 픽셀
+    mask = np.zeros((h, w), dtype=bool)
+    mask[h // 4: 3 * h // 4, w // 3: 2 * w // 3] = True
+
+    # 정확도 확인 (샘플 픽셀)
+    xyz = RSUtils.depth_frame_to_xyz(depth, intrin, scale)
+    for (x, y) in [(0, 0), (w // 2, h // 2), (w - 1, h - 1), (123, 45)]:
+        ref = RSUtils.depth_to_xyz(x, y, depth, intrin, scale)
+        assert np.allclose(xyz[y, x], ref, equal_nan=True, atol=1e-5), (x, y, xyz[y, x], ref)
+
+    ys, xs = np.mgrid[0:h:args.step, 0:w:args.step]
+    pts = list(zip(xs.ravel().tolist(), ys.ravel().tolist()))
+
+    def per_pixel():
+        for x, y in pts:
+            RSUtils.depth_to_xyz(x, y, depth, intrin, scale)
+
+    t_pixel = timeit(per_pixel, max(1, args.repeat // 10)) * (args.step * args.step)
+    t_frame = timeit(lambda: RSUtils.depth_frame_to_xyz(depth, intrin, scale), args.repeat)
+    t_mask = timeit(lambda: RSUtils.depth_frame_to_xyz(depth, intrin, scale, mask=mask), args.repeat)
+    t_roi = timeit(lambda: RSUtils.roi_distance_stats(depth, scale, mask=mask), args.repeat)
+
+    print(f"depth {w}x{h}, mask {int(mask.sum())} px")
+    print(f"pixel loop (est. full frame): {t_pixel * 1e3:9.2f} ms")
+    print(f"frame_to_xyz (full frame)   : {t_frame * 1e3:9.2f} ms  (x{t_pixel / t_frame:.0f})")
+    print(f"frame_to_xyz (mask)         : {t_mask * 1e3:9.2f} ms")
+    print(f"roi_distance_stats (mask)   : {t_roi * 1e3:9.2f} ms")
+    print(RSUtils.roi_distance_stats(depth, scale, mask=mask))
+
+
+if __name__ == "__main__":
+    main()
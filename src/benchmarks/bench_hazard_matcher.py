@@ -0,0 +1,76 @@
+"""
+위험 키워드 매칭 벤치마크 (긴 VLM 설명 기준)
+- old     : 기존 방식. lower() 후 HAZARD_PATTERNS 를 re.search 로 하나씩 + keyword_map 부분 문자열 12회
+- matcher : HazardMatcher.scan 한 번 (판정 + 한국어 라벨)
+
+결과(판정, 라벨과 그 순서)가 기존 방식과 완전히 같은지 먼저 확인한 뒤 시간을 잼.
+실행: python src/benchmarks/bench_hazard_matcher.py [--words 300] [--repeat 200]
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "system"))
+from HazardMatcher import HazardMatcher, HAZARD_PATTERNS, KEYWORD_LABELS
+
+FILLER = ("the a room with table chair window light person standing near wall floor door "
+          "shelf bag bottle street car tree sky cloud building sign road people walking "
+          "fireplace waterfall begun endangered hazardous crashing").split()
+HAZARDS = ["fire", "smoke", "knife", "falling", "no harness", "damaged vehicle", "collision",
+           "construction", "gun", "explosion"]
+
+
+def old_scan(text):
+    t = text.lower()
+    danger = any(re.search(p, t) for p in HAZARD_PATTERNS)
+    labels = [kor for eng, kor in KEYWORD_LABELS.items() if eng in t]
+    return danger, labels
+
+
+def make_texts(n, words, hazard_ratio, seed=0):
+    rng = random.Random(seed)
+    texts = []
+    for i in range(n):
+        ws = [rng.choice(FILLER) for _ in range(words)]
+        if rng.random() < hazard_ratio:
+            ws.insert(rng.randrange(len(ws)), rng.choice(HAZARDS))
+        texts.append(" ".join(ws).capitalize() + ".")
+    return texts
+
+
+def bench(fn, texts, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for t in texts:
+            fn(t)
+    return (time.perf_counter() - t0) / (repeat * len(texts))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--words", type=int, default=300)
+    ap.add_argument("--texts", type=int, default=20)
+    ap.add_argument("--repeat", type=int, default=200)
+    ap.add_argument("--hazard-ratio", type=float, default=0.3)
+    args = ap.parse_args()
+
+    matcher = HazardMatcher()
+    texts = make_texts(args.texts, args.words, args.hazard_ratio)
+    # 정확도 확인
+    for t in texts + [" ".join(HAZARDS), "A calm empty room.", "Wildfire near a campfire, gunfire."]:
+        assert old_scan(t) == matcher.scan(t), (t, old_scan(t), matcher.scan(t))
+
+    t_old = bench(old_scan, texts, args.repeat)
+    t_new = bench(matcher.scan, texts, args.repeat)
+    t_bool = bench(matcher.is_dangerous, texts, args.repeat)
+    print(f"{args.texts} descriptions x {args.words} words, hazard ratio {args.hazard_ratio}")
+    print(f"old (4 re.search + 12 substring): {t_old * 1e6:8.1f} us/desc")
+    print(f"HazardMatcher.scan              : {t_new * 1e6:8.1f} us/desc  (x{t_old / t_new:.1f})")
+    print(f"HazardMatcher.is_dangerous      : {t_bool * 1e6:8.1f} us/desc")
+
+
+if __name__ == "__main__":
+    main()
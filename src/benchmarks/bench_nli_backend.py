@@ -0,0 +1,145 @@
+"""
+NLI 백엔드 벤치마크 (Llm.nli_hazard_scores, 가설 배치 1회 forward 기준)
+- torch     : fp32 PyTorch (기준)
+- int8      : PyTorch dynamic int8 양자화
+- onnx      : ONNX Runtime (캐시된 .onnx 파일)
+- onnx-int8 : ONNX Runtime + dynamic int8 양자화
+
+백엔드마다 별도 프로세스에서 실행해 메모리(RSS 증가분)를 서로 섞지 않음.
+onnx 계열은 먼저 별도 프로세스에서 export 캐시를 만들어 두므로, 측정 프로세스는 PyTorch 모델을 읽지 않음
+(RSS/로드 시간 = 캐시된 백엔드만의 비용).
+일치도는 torch 결과 대비 판정(최대 점수 >= threshold) 일치율과 라벨별 확률 최대 오차.
+
+실행: python src/benchmarks/bench_nli_backend.py [--backends torch,int8,onnx,onnx-int8] [--repeat 5]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "system"))
+
+SAMPLES = [
+    "A person is standing in a kitchen next to a stove with flames coming out of a pan.",
+    "Thick black smoke is rising from the roof of a building.",
+    "A man is holding a knife in a dark alley.",
+    "A worker is standing on the top of a tall ladder without a harness.",
+    "Two cars collided at an intersection and one vehicle is overturned.",
+    "A construction site with an open trench and heavy machinery nearby.",
+    "A living room with a sofa, a coffee table and a television.",
+    "A cat is sleeping on a bed next to a window.",
+    "People are walking on a sidewalk on a sunny day.",
+    "A desk with a laptop, a cup of coffee and some papers.",
+    "A child is playing with a ball in a park.",
+    "An empty hallway with white walls and a wooden door.",
+    "A bookshelf filled with books and a small plant.",
+    "A wet floor sign is placed in the middle of a corridor.",
+    "A person is riding a bicycle on a quiet street.",
+    "There is a candle burning on the dining table.",
+    "A man points a gun at another person.",
+    "Broken glass is scattered across the floor near a window.",
+    "A bus is parked by the road with its doors open.",
+    "The image shows a blurry view of a ceiling light.",
+]
+
+
+def rss_mb():
+    """현재 RSS(MB). /proc 이 없으면 최대 RSS로 대체"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_one(backend, repeat):
+    import torch
+    torch.set_num_threads(max(1, os.cpu_count() or 1))
+    from Llm import Llm
+
+    base = rss_mb()
+    t0 = time.perf_counter()
+    llm = Llm(nli_backend=backend)
+    load_s = time.perf_counter() - t0
+    mem = rss_mb() - base
+
+    for s in SAMPLES[:3]:                          # 워밍업
+        llm.nli_hazard_scores(s)
+    times, scores = [], []
+    for s in SAMPLES:
+        best = float("inf")
+        for _ in range(repeat):
+            t = time.perf_counter()
+            sc = llm.nli_hazard_scores(s)
+            best = min(best, time.perf_counter() - t)
+        times.append(best)
+        scores.append(sc)
+    times.sort()
+    return {
+        "backend": backend,
+        "load_s": load_s,
+        "rss_mb": mem,
+        "mean_ms": sum(times) / len(times) * 1e3,
+        "p50_ms": times[len(times) // 2] * 1e3,
+        "max_ms": times[-1] * 1e3,
+        "scores": scores,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--backends", default="torch,int8,onnx,onnx-int8")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--threshold", type=float, default=0.6)
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    ap.add_argument("--prepare", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        if args.prepare:
+            from Llm import Llm
+            Llm(nli_backend=args.child)             # export/양자화 캐시 생성만
+            return
+        print(json.dumps(run_one(args.child, args.repeat)))
+        return
+
+    backends = args.backends.split(",")
+    if "torch" not in backends:
+        backends.insert(0, "torch")                 # 일치도 기준
+    results = {}
+    for b in backends:
+        if b.startswith("onnx"):
+            prep = subprocess.run([sys.executable, __file__, "--child", b, "--prepare"], capture_output=True, text=True)
+            if prep.returncode != 0:
+                print(f"[{b}] 캐시 준비 실패: {prep.stderr.strip().splitlines()[-1] if prep.stderr.strip() else prep.returncode}")
+                continue
+        out = subprocess.run([sys.executable, __file__, "--child", b, "--repeat", str(args.repeat)],
+                             capture_output=True, text=True)
+        if out.returncode != 0:
+            print(f"[{b}] 실패: {out.stderr.strip().splitlines()[-1] if out.stderr.strip() else out.returncode}")
+            continue
+        results[b] = json.loads(out.stdout.strip().splitlines()[-1])
+
+    ref = results.get("torch")
+    print(f"{len(SAMPLES)} descriptions, best of {args.repeat}, threshold {args.threshold}")
+    print(f"{'backend':<10} {'load s':>7} {'RSS MB':>8} {'mean ms':>8} {'p50 ms':>8} {'max ms':>8} {'agree':>7} {'max |dp|':>9}")
+    for b, r in results.items():
+        agree, max_dp = "-", "-"
+        if ref is not None:
+            same, dp = 0, 0.0
+            for a, c in zip(ref["scores"], r["scores"]):
+                same += (max(a.values()) >= args.threshold) == (max(c.values()) >= args.threshold)
+                dp = max(dp, max(abs(a[k] - c[k]) for k in a))
+            agree, max_dp = f"{same / len(SAMPLES):.0%}", f"{dp:.3f}"
+        print(f"{b:<10} {r['load_s']:7.2f} {r['rss_mb']:8.1f} {r['mean_ms']:8.2f} {r['p50_ms']:8.2f} "
+              f"{r['max_ms']:8.2f} {agree:>7} {max_dp:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+TTS 엔진별 첫 소리까지 시간(time-to-first-audio) 벤치마크 (재생 없이 합성만, 캐시 없음)
+- whole : 전체 텍스트를 한 번에 합성 (기존 방식: 합성이 끝나야 재생 시작)
+- chunk : split_sentences 후 첫 문장만 합성 (스트리밍: 첫 문장 합성 직후 재생 시작)
+- total : 문장별 합성 시간 합 (스트리밍에서 뒤 문장은 재생 중에 합성되므로 체감 지연에 포함되지 않음)
+
+실행: python src/benchmarks/bench_tts_backend.py [--backends gtts espeak] [--repeat 5]
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "HardwareSystem"))
+from Tts import TTS_BACKENDS, load_tts_backend, split_sentences
+
+TEXTS = {
+    "alert": "위험한 상황이 감지되었습니다. 주의하세요.",
+    "answer": ("오늘 입으신 옷은 밝은 회색 셔츠와 남색 바지입니다. 전체적으로 차분한 느낌이라 무난합니다. "
+               "다만 신발이 갈색이라 조금 어두워 보일 수 있습니다. 흰색 운동화로 바꾸시면 더 가벼워 보입니다. "
+               "겉옷이 필요하시면 베이지색 재킷을 추천합니다."),
+}
+
+
+def ms(samples):
+    a = np.asarray(samples) * 1e3
+    return f"{np.median(a):8.1f} {a.max():8.1f}"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--backends", nargs="+", default=list(TTS_BACKENDS))
+    ap.add_argument("--language", default="ko")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    print(f"{'backend':<8} {'text':<7} {'mode':<6} {'med ms':>8} {'max ms':>8}  (bytes)")
+    for name in args.backends:
+        try:
+            backend = load_tts_backend(name)
+        except Exception as e:
+            print(f"{name:<8} 사용 불가: {e}")
+            continue
+        for label, text in TEXTS.items():
+            chunks = split_sentences(text)
+            whole, first, total = [], [], []
+            size = 0
+            try:
+                for _ in range(args.repeat):
+                    t0 = time.perf_counter()
+                    size = len(backend.synthesize(text, args.language, False))
+                    whole.append(time.perf_counter() - t0)
+
+                    t0 = time.perf_counter()
+                    backend.synthesize(chunks[0], args.language, False)
+                    first.append(time.perf_counter() - t0)
+                    for c in chunks[1:]:
+                        backend.synthesize(c, args.language, False)
+                    total.append(time.perf_counter() - t0)
+            except Exception as e:
+                print(f"{name:<8} {label:<7} 합성 실패: {e}")
+                continue
+            print(f"{name:<8} {label:<7} {'whole':<6} {ms(whole)}  ({size})")
+            print(f"{name:<8} {label:<7} {'chunk':<6} {ms(first)}  ({len(chunks)}문장)")
+            print(f"{name:<8} {label:<7} {'total':<6} {ms(total)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+로컬 Ollama 대역 서버 (/api/chat 만 구현, stream / non-stream 모두 지원)
+- 지연: latency(첫 토큰까지, ± jitter) + 토큰당 token_delay
+- 응답: responses 목록을 순서대로 순환
+- 장애: fail_rate 확률로 HTTP 500, hang_rate 확률로 hang_s 동안 응답 없음 (타임아웃 재현)
+- script(JSON 목록)를 주면 요청마다 한 항목씩 순환 적용
+    [{"response": "...", "latency": 1.5, "fail": false, "hang": false}, ...]
+
+Llm은 ollama 패키지 기본 클라이언트를 쓰므로 import 전에 OLLAMA_HOST를 서버 주소로 지정해야 함.
+단독 실행: python src/benchmarks/fake_ollama.py --port 11435 --latency 2.0 --fail-rate 0.1
+          OLLAMA_HOST=http://127.0.0.1:11435 python src/system/main.py
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_RESPONSES = [
+    "A living room with a sofa, a coffee table and a television.",
+    "A person is walking down a hallway with white walls.",
+    "A kitchen with a stove where flames and smoke are rising from a pan.",
+    "A desk with a laptop and a cup of coffee next to a window.",
+]
+
+
+class FakeOllama:
+    def __init__(self, host="127.0.0.1", port=0, latency=2.0, jitter=0.0, token_delay=0.02,
+                 responses=None, fail_rate=0.0, hang_rate=0.0, hang_s=30.0, script=None, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.token_delay = token_delay
+        self.responses = list(responses or DEFAULT_RESPONSES)
+        self.fail_rate = fail_rate
+        self.hang_rate = hang_rate
+        self.hang_s = hang_s
+        self.script = script
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._n = 0
+
+        # 계측
+        self.requests = 0
+        self.failures = 0
+        self.hangs = 0
+        self.active = 0
+        self.max_active = 0
+
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="FakeOllama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _next_plan(self):
+        """이번 요청의 (응답, 첫 토큰 지연, 실패 여부, hang 여부)"""
+        with self._lock:
+            i = self._n
+            self._n += 1
+            if self.script:
+                step = self.script[i % len(self.script)]
+                return (step.get("response", self.responses[i % len(self.responses)]),
+                        step.get("latency", self.latency), step.get("fail", False), step.get("hang", False))
+            latency = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            fail = self._rng.random() < self.fail_rate
+            hang = not fail and self._rng.random() < self.hang_rate
+            return self.responses[i % len(self.responses)], latency, fail, hang
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _json(self, code, obj):
+                body = json.dumps(obj).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                if self.path != "/api/chat":
+                    return self._json(404, {"error": f"not found: {self.path}"})
+                req = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with fake._lock:
+                    fake.requests += 1
+                    fake.active += 1
+                    fake.max_active = max(fake.max_active, fake.active)
+                try:
+                    self._chat(req)
+                finally:
+                    with fake._lock:
+                        fake.active -= 1
+
+            def _chat(self, req):
+                text, latency, fail, hang = fake._next_plan()
+                model = req.get("model", "fake")
+                if hang:
+                    with fake._lock:
+                        fake.hangs += 1
+                    time.sleep(fake.hang_s)
+                    return self._json(500, {"error": "fake hang"})
+                time.sleep(latency)
+                if fail:
+                    with fake._lock:
+                        fake.failures += 1
+                    return self._json(500, {"error": "fake failure"})
+
+                tokens = [t + " " for t in text.split(" ")]
+                tokens[-1] = tokens[-1].rstrip()
+                if not req.get("stream", False):
+                    time.sleep(fake.token_delay * len(tokens))
+                    return self._json(200, _message(model, text, done=True))
+
+                # NDJSON 스트림 (HTTP/1.0: 연결 종료로 본문 끝 표시)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                for tok in tokens:
+                    self.wfile.write((json.dumps(_message(model, tok, done=False)) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+                    time.sleep(fake.token_delay)
+                self.wfile.write((json.dumps(_message(model, "", done=True)) + "\n").encode("utf-8"))
+
+        return Handler
+
+    def stats(self):
+        with self._lock:
+            return {"requests": self.requests, "failures": self.failures, "hangs": self.hangs,
+                    "max_concurrent": self.max_active}
+
+
+def _message(model, content, done):
+    msg = {
+        "model": model,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "message": {"role": "assistant", "content": content},
+        "done": done,
+    }
+    if done:
+        msg["done_reason"] = "stop"
+    return msg
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=11435)
+    ap.add_argument("--latency", type=float, default=2.0)
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--token-delay", type=float, default=0.02)
+    ap.add_argument("--fail-rate", type=float, default=0.0)
+    ap.add_argument("--hang-rate", type=float, default=0.0)
+    ap.add_argument("--hang-s", type=float, default=30.0)
+    ap.add_argument("--script", help="요청별 응답/지연/장애 JSON 목록 파일")
+    args = ap.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script) as f:
+            script = json.load(f)
+    fake = FakeOllama(args.host, args.port, args.latency, args.jitter, args.token_delay,
+                      fail_rate=args.fail_rate, hang_rate=args.hang_rate, hang_s=args.hang_s, script=script)
+    fake.start()
+    print(f"fake ollama: {fake.url} (OLLAMA_HOST={fake.url})")
+    try:
+        while True:
+            time.sleep(5)
+            print(fake.stats())
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import threading
+from HardwareSystem.Metrics import LatencyHistogram
+
+
+class AnalysisScheduler:
+    """
+    분석(encode + VLM + NLI) 종단 지연 기반 적응형 스케줄러.
+    - 지연 추정: EWMA(alpha). 성공 시 interval = clamp(factor * 추정치 / max_in_flight, min_interval, max_interval)
+    - 동시에 max_in_flight건까지만 진행 (begin → end 사이 건수가 한도면 ready()가 False)
+    - 실패/타임아웃이 연속되면 최소 간격(min_gap)을 backoff 배수로 늘려 백엔드를 쉬게 함
+    interval은 장면 변화 게이트의 기본 주기로, min_gap은 조기 트리거 하한으로 쓰임.
+    """
+    def __init__(self, base_interval=20.0, min_interval=5.0, max_interval=60.0,
+                 factor=1.2, alpha=0.3, timeout=25.0, backoff=2.0, max_in_flight=1):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.factor = factor
+        self.alpha = alpha
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_in_flight = max_in_flight
+
+        self.interval = base_interval        # 현재 기본 분석 주기
+        self.min_gap = min_interval          # 분석 시작 간 최소 간격
+        self.latency_est = None              # EWMA 종단 지연(초)
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._last_begin = None
+        self._fail_streak = 0
+
+        # 계측
+        self.completed = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.last_latency = None
+        self.latency = LatencyHistogram()
+
+    def ready(self, now):
+        """새 분석을 시작해도 되는지 (진행 중 요청이 없고 최소 간격이 지남)"""
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                return False
+            return self._last_begin is None or now - self._last_begin >= self.min_gap
+
+    def begin(self, now):
+        with self._lock:
+            self._in_flight += 1
+            self._last_begin = now
+
+    def end(self, latency, ok=True):
+        """분석 1건 종료 보고. latency: 종단 지연(초)"""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self.last_latency = latency
+            self.latency.add(latency)
+            timed_out = latency >= self.timeout
+            if timed_out:
+                self.timeouts += 1
+
+            # 타임아웃도 지연 표본으로 반영 (백엔드가 느려졌다는 신호)
+            if self.latency_est is None:
+                self.latency_est = latency
+            else:
+                self.latency_est = self.alpha * latency + (1 - self.alpha) * self.latency_est
+
+            if ok and not timed_out:
+                self.completed += 1
+                self._fail_streak = 0
+                self.min_gap = self.min_interval
+            else:
+                self.failures += 1
+                self._fail_streak += 1
+                self.min_gap = min(self.max_interval, self.min_interval * self.backoff ** self._fail_streak)
+
+            # 여러 건이 겹쳐 진행되면 처리량이 그만큼 늘어나므로 주기도 나눠서 잡음
+            target = self.factor * self.latency_est / self.max_in_flight
+            self.interval = min(self.max_interval, max(self.min_interval, self.min_gap, target))
+
+    def cancel(self):
+        """begin 후 분석이 시작되지 못했을 때 (큐 교체 등)"""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "interval_s": self.interval,
+                "min_gap_s": self.min_gap,
+                "latency_est_s": self.latency_est,
+                "last_latency_s": self.last_latency,
+                "in_flight": self._in_flight,
+                "completed": self.completed,
+                "failures": self.failures,
+                "timeouts": self.timeouts,
+                "latency_ms": self.latency.snapshot(),
+            }
@@ -1,150 +1,358 @@
-from HardwareSystem.HardwareResourceManager import hardware_manager
+from HardwareSystem.HardwareResourceManager import hardware_manager, StreamProfile
 from SafetyEventHandler import safety_events, threading
 from Llm import Llm
 from collections import deque
 import time
 import queue
-from system.main import RSUtils
+from EncodeCache import encode_cache, ANALYSIS_WIDTH, ANALYSIS_JPEG_QUALITY
+from ProximityDetector import ProximityDetector
+from SceneChange import SceneChangeGate
+from AnalysisScheduler import AnalysisScheduler
+from HardwareSystem.Metrics import LatencyHistogram
+from HardwareSystem.Tts import PRIORITY_CRITICAL
+from Pipeline import Stage, Reorderer
+import os
+
+
+class _AnalysisJob:
+    """파이프라인 단계 사이를 오가는 분석 1건 (seq: 프레임 ts 순서대로 붙는 순번)"""
+    __slots__ = ("seq", "ts", "t0", "b64", "description", "analysis_time", "first_alert", "verdict", "error")
+
+    def __init__(self, seq, ts):
+        self.seq = seq
+        self.ts = ts
+        self.t0 = time.monotonic()
+        self.b64 = None
+        self.description = None
+        self.analysis_time = 0.0
+        self.first_alert = None
+        self.verdict = None
+        self.error = None
 
 
 class Condition_check:
     """카메라 캡처 -> 이미지 분석 -> 위험 판단 -> 음성 알림 시스템"""
     
-    def __init__(self, analysis_interval=20.0):
+    def __init__(self, analysis_interval=20.0, min_interval=5.0, max_interval=60.0, enable_proximity=True,
+                 stream_vlm=True, vlm_concurrency=2, detector_weights=None, detector_classes="classes.json"):
         # 컴포넌트 초기화
         self.hardware_manager = hardware_manager
         self.llm = Llm()
         self.safety_events = safety_events  # 전역 이벤트 핸들러 참조
         # 설정값 통합
-        self.TARGET_WIDTH = 640
-        self.JPEG_QUALITY = 82
+        self.TARGET_WIDTH = ANALYSIS_WIDTH
+        self.JPEG_QUALITY = ANALYSIS_JPEG_QUALITY
         self.ANALYSIS_INTERVAL = analysis_interval
+        self.MIN_INTERVAL = min_interval      # 큰 변화라도 이 간격 이내에는 재분석 안 함
+        self.MAX_INTERVAL = max_interval      # 변화가 없어도 이 간격마다 한 번은 분석
         self.ADAPTIVE_FACTOR = 1.2
+        self.NLI_THRESHOLD = 0.6
+        self.STREAM_VLM = stream_vlm           # VLM 응답을 스트리밍으로 받아 확실한 위험은 먼저 알림
+        self.VLM_CONCURRENCY = vlm_concurrency # 동시에 보내는 ollama 요청 수 (서버 OLLAMA_NUM_PARALLEL과 맞출 것)
+        self.DETECTOR_DANGER = 0.8             # 감지기 위험 확률이 이 이상이면 VLM 없이 바로 알림
+        self.DETECTOR_CLEAR = 0.2              # 이 미만이면 위험 없음으로 보고 VLM 생략
         self.PRINT_EVERY = 1.0
         self.VOICE_COOLDOWN = 10.0
         
         # 상태 관리
         self.stop_flag = False
         self.last_voice_alert = 0
+        self._alert_lock = threading.Lock()    # 조기 알림(VLM 스레드)과 최종 알림이 쿨다운을 공유
         self.analysis_history = deque(maxlen=self.llm.MAJORITY_WINDOW)
+        # 장면 변화 게이트: 거의 같은 장면은 VLM 생략, 큰 변화는 주기 전에 분석
+        self.scene_gate = SceneChangeGate(min_interval=self.MIN_INTERVAL,
+                                          nominal_interval=self.ANALYSIS_INTERVAL,
+                                          max_interval=self.MAX_INTERVAL)
+        # 종단 지연(encode+VLM+NLI) 기반 주기 조정: 빠르면 주기 단축, 느리거나 타임아웃이면 백오프
+        self.scheduler = AnalysisScheduler(base_interval=self.ANALYSIS_INTERVAL,
+                                           min_interval=self.MIN_INTERVAL,
+                                           max_interval=self.MAX_INTERVAL,
+                                           factor=self.ADAPTIVE_FACTOR,
+                                           timeout=self.llm.OLLAMA_TIMEOUT,
+                                           max_in_flight=self.VLM_CONCURRENCY)
+
+        # 1차 로컬 감지기 (가중치가 있을 때만). 애매한 프레임만 VLM으로 올림
+        self.detector = None
+        detector_weights = detector_weights or os.environ.get("HAZARD_DETECTOR_WEIGHTS")
+        if detector_weights:
+            try:
+                from HazardDetector import HazardDetector
+                self.detector = HazardDetector(detector_weights, detector_classes, matcher=self.llm.hazard_matcher)
+                print(f"감지기 캐스케이드 사용 - 위험 클래스: {', '.join(self.detector.hazard_classes)}")
+            except Exception as e:
+                print(f"감지기 로드 실패, VLM만 사용: {e}")
+        # 캐스케이드 계측: 단계별 판정 수 / 지연 (forced: clear였지만 max_interval이라 VLM 확인)
+        self.tier_counts = {"danger": 0, "clear": 0, "uncertain": 0, "forced": 0}
+        self.tier_latency = {"detector": LatencyHistogram(), "vlm": LatencyHistogram()}
+
+        # 분석 파이프라인: (감지기 → det_q →) frame_q → 인코딩 → enc_q → VLM(동시 N건) → text_q → 분류/순서 복원/다수결
+        self._det_q = queue.Queue(maxsize=1)
+        self._enc_q = queue.Queue(maxsize=self.VLM_CONCURRENCY)
+        self._text_q = queue.Queue(maxsize=self.VLM_CONCURRENCY * 2)
+        self._next_seq = 0
+        self._reorder = Reorderer()
+        self.stages = []
+
+        # 스트리밍 조기 알림 계측 (VLM 요청 → 첫 알림 / 전체 분석 시간과 별도)
+        self.early_alerts = 0
+        self.time_to_first_alert = LatencyHistogram()
+        self.analysis_time = LatencyHistogram()
+        self.alert_dispatch = LatencyHistogram()   # 판정 시각 → 스피커 큐 투입까지
+
+        # depth 기반 근접 장애물 감지 (VLM 주기와 무관하게 실시간 동작)
+        self.proximity = ProximityDetector(self.hardware_manager, self.safety_events) if enable_proximity else None
         
         print(f"안전 모니터링 시스템 초기화 완료 - 모델: {self.llm.MODEL_NAME}")
-        print(f"분석 주기: {self.ANALYSIS_INTERVAL}초")
+        print(f"분석 주기: {self.ANALYSIS_INTERVAL}초 (장면 변화에 따라 {self.MIN_INTERVAL}~{self.MAX_INTERVAL}초)")
 
     def run(self):
         """메인 실행 함수"""
         print("=== 안전 모니터링 시스템 시작 ===")
         
         t_capture = threading.Thread(target=self.capture_loop, daemon=True)
-        t_analyze = threading.Thread(target=self.analyze_loop, daemon=True)
+        self.stages = self._build_pipeline()
         
         t_capture.start()
-        t_analyze.start()
+        for stage in self.stages:
+            stage.start()
+        if self.proximity:
+            try:
+                self.proximity.start()
+            except Exception as e:
+                print(f"근접 감지 시작 실패: {e}")
         
         try:
             while not self.stop_flag:
+                # 판정이 들어오는 즉시 처리 (timeout은 stop_flag 확인용)
                 try:
-                    majority, desc, took, timestamp = self.llm.result_q.get(timeout=1.0)
-                    
-                    time_str = time.strftime('%H:%M:%S', time.localtime(timestamp))
-                    print(f"[{time_str}] 판정: {majority} | 처리시간: {took:.2f}s")
-                    
-                    if majority == "위험":
-                        self.safety_events.on_danger_detected(desc, timestamp)
-                        self._handle_danger_alert(desc, timestamp)
-                        
+                    result = self.llm.result_q.get(timeout=1.0)
                 except queue.Empty:
-                    pass
-                    
-                time.sleep(0.5)
+                    continue
+                self._dispatch(*result)
                 
         except KeyboardInterrupt:
             print("\n시스템 종료 요청을 받았습니다...")
             
         finally:
-            self._cleanup(t_capture, t_analyze)
+            self._cleanup(t_capture)
+
+    def _dispatch(self, majority, desc, took, timestamp, hazards):
+        """판정 1건을 이벤트 핸들러/음성 알림으로 전달"""
+        time_str = time.strftime('%H:%M:%S', time.localtime(timestamp))
+        print(f"[{time_str}] 판정: {majority} | 처리시간: {took:.2f}s")
+
+        if majority == "위험":
+            self.safety_events.on_danger_detected(desc, timestamp)
+            self._handle_danger_alert(desc, timestamp, hazards)
+        else:
+            self.safety_events.on_safe_detected()
 
     def capture_loop(self):
-        """허브에서 프레임 구독 → 20초마다 최신 프레임만 큐에 투입"""
+        """허브에서 프레임 구독 → 장면 변화 게이트를 통과한 최신 프레임만 큐에 투입"""
         print("RealSense Hub 구독 기반 캡처 루프 시작")
 
         hub = self.hardware_manager.get_camera()
-        q = hub.subscribe(maxlen=1)
+        # 분석은 color 한 장만 쓰므로 depth/정렬 없이 2fps로만 받음 (변화 감지용)
+        sub = hub.subscribe(maxlen=1, profile=StreamProfile.color_only(fps=2.0),
+                            name="condition_check")
         try:
-            last_push_t = 0.0
-
             while not self.stop_flag:
-                if not q:
-                    time.sleep(0.01)
+                # 프레임이 올 때까지 블로킹 대기 (stop_flag 확인을 위해 timeout)
+                ref = sub.get(timeout=1.0)
+                if ref is None:
                     continue
 
-                try:
-                    ts, color_bgr, depth_z16 = q[-1]
-                except (IndexError, ValueError):
-                    time.sleep(0.01)
-                    continue
+                with ref:
+                    ts, color_bgr, depth_z16 = ref
+
+                    now = time.monotonic()
+                    # 진행 중인 분석이 VLM_CONCURRENCY건이면 다음 프레임을 쌓지 않음 (스케줄러 max_in_flight)
+                    if not self.scheduler.ready(now):
+                        continue
+                    # 스케줄러가 정한 주기를 게이트에 반영
+                    self.scene_gate.min_interval = self.scheduler.min_gap
+                    self.scene_gate.nominal_interval = self.scheduler.interval
+                    # 축소 grayscale 블록 차이로 분석 여부 판단 (프레임당 1ms 미만)
+                    push, reason = self.scene_gate.should_analyze(color_bgr, now)
+                    if push:
+                        self.scheduler.begin(now)
+                        # 링 슬롯은 release 후 재사용되므로 분석용으로는 복사본을 넘김
+                        # ts는 인코딩 캐시 키로 쓰임 (같은 프레임은 소비자끼리 인코딩 공유)
+                        frame = (ts, color_bgr.copy(), reason)
 
-                now = time.monotonic()
-                # 🔴 모션 기준 제거: 20초 주기로만 밀어넣기
-                if now - last_push_t >= self.ANALYSIS_INTERVAL:
-                    frame = color_bgr
-
-                    # ✅ 큐에 남아있는 예전 프레임 모두 폐기(항상 최신 한 장만 유지)
-                    try:
-                        while True:
-                            self.llm.frame_q.get_nowait()
-                    except queue.Empty:
-                        pass
-
-                    try:
-                        self.llm.frame_q.put_nowait(frame)
-                        last_push_t = now
-                        print(f"[{time.strftime('%H:%M:%S')}] 이미지 큐 푸시 (every {int(self.ANALYSIS_INTERVAL)}s)")
-                    except queue.Full:
-                        # maxsize=1 이지만, 혹시 모를 레이스 컨디션 대비
+                        # ✅ 큐에 남아있는 예전 프레임 모두 폐기(항상 최신 한 장만 유지)
                         try:
-                            _ = self.llm.frame_q.get_nowait()
-                            self.llm.frame_q.put_nowait(frame)
-                            last_push_t = now
+                            while True:
+                                self.llm.frame_q.get_nowait()
+                                self.scheduler.cancel()
                         except queue.Empty:
                             pass
 
-                time.sleep(0.01)
+                        try:
+                            self.llm.frame_q.put_nowait(frame)
+                            print(f"[{time.strftime('%H:%M:%S')}] 이미지 큐 푸시 ({reason}, 변화 {self.scene_gate.last_score:.2f}, "
+                                  f"절약 {self.scene_gate.saved}회, 주기 {self.scheduler.interval:.1f}초)")
+                        except queue.Full:
+                            # maxsize=1 이지만, 혹시 모를 레이스 컨디션 대비
+                            try:
+                                _ = self.llm.frame_q.get_nowait()
+                                self.scheduler.cancel()
+                                self.llm.frame_q.put_nowait(frame)
+                            except (queue.Empty, queue.Full):
+                                self.scheduler.cancel()
         finally:
-            hub.unsubscribe(q)
+            hub.unsubscribe(sub)
 
-    def analyze_loop(self):
-        print("이미지 분석 루프 시작")
-        while not self.stop_flag:
-            try:
-                frame = self.llm.frame_q.get(timeout=5.0)
-            except queue.Empty:
-                continue
+    def _build_pipeline(self):
+        stop = lambda: self.stop_flag
+        # 아직 job이 아닌 (ts, frame, 사유) 단계에서 실패하면 그 프레임의 스케줄러 예약만 반환
+        release = lambda item, e: self.scheduler.cancel()
+        print(f"이미지 분석 파이프라인 시작 (VLM 동시 요청 {self.VLM_CONCURRENCY}건)")
+        stages = []
+        frames = self.llm.frame_q
+        if self.detector is not None:
+            stages.append(Stage("detect", self._detect_stage, frames, self._det_q, stop=stop, on_drop=release))
+            frames = self._det_q
+        return stages + [
+            Stage("encode", self._encode_stage, frames, self._enc_q, stop=stop, on_drop=release),
+            Stage("vlm", self._vlm_stage, self._enc_q, self._text_q, workers=self.VLM_CONCURRENCY, stop=stop),
+            Stage("classify", self._classify_stage, self._text_q, stop=stop),
+        ]
 
-            try:
-                b64_image = RSUtils.to_base64_jpeg(frame, self.TARGET_WIDTH, self.JPEG_QUALITY)
+    def _detect_stage(self, item):
+        """로컬 감지기 1차 판정: 확실한 위험은 바로 알림, 확실히 없으면 종료, 애매하면 VLM으로 전달"""
+        frame_ts, frame, reason = item
+        t0 = time.monotonic()
+        try:
+            decision, hits, top = self.detector.assess(frame, self.DETECTOR_DANGER, self.DETECTOR_CLEAR)
+        except Exception as e:
+            print(f"감지기 오류: {e}")
+            decision, hits, top = "uncertain", [], 0.0
+        self.tier_latency["detector"].add(time.monotonic() - t0)
+
+        if decision == "danger":
+            self.tier_counts["danger"] += 1
+            self.scheduler.cancel()            # VLM 경로를 타지 않으므로 예약만 반환
+            self._on_detector_hazard(hits)
+            return None
+        if decision == "clear" and reason != "max_interval":
+            self.tier_counts["clear"] += 1
+            self.scheduler.cancel()
+            print(f"[{time.strftime('%H:%M:%S')}] ✅ 감지기 판정 안전 (위험 확률 {top:.2f}) - VLM 생략")
+            return None
+        # 애매하거나, 오랫동안 VLM 확인이 없었으면 (max_interval) VLM으로 올림
+        self.tier_counts["uncertain" if decision == "uncertain" else "forced"] += 1
+        return item
 
-                print(f"[{time.strftime('%H:%M:%S')}] 🔍 AI 모델 분석 시작...")
-                description, analysis_time = self.llm.ollama_describe(b64_image, self.llm.MODEL_NAME)
+    def _on_detector_hazard(self, hits):
+        labels = []
+        for name, _ in hits:
+            for label in self.llm.hazard_matcher.scan(name.replace("_", " "))[1] or [name]:
+                if label not in labels:
+                    labels.append(label)
+        description = "감지기: " + ", ".join(f"{name} {p:.2f}" for name, p in hits)
+        now = time.time()
+        print(f"🚨 감지기 위험 판정: {description}")
+        self.safety_events.on_danger_detected(description, now)
+        self._handle_danger_alert(description, now, labels)
 
-                regex_result = self.llm.classify_text_regex(description)
-                nli_result = self.llm.nli_danger(description, threshold=0.6)
-                individual_result = "위험" if "위험" in (regex_result, nli_result) else "안전"
+    def _encode_stage(self, item):
+        """(ts, frame, 사유) → 순번 부여 + base64 JPEG (단일 worker라 순번이 ts 순서와 같음)"""
+        frame_ts, frame = item[:2]
+        job = _AnalysisJob(self._next_seq, frame_ts)
+        self._next_seq += 1
+        try:
+            job.b64 = encode_cache.base64_jpeg(frame_ts, frame, self.TARGET_WIDTH, self.JPEG_QUALITY)
+        except Exception as e:
+            # 실패해도 순서 복원이 끊기지 않도록 job은 끝까지 흘려보냄
+            print(f"인코딩 오류: {e}")
+            job.error = e
+        return job
 
-                self.analysis_history.append(individual_result)
-                danger_votes = sum(1 for x in self.analysis_history if x == "위험")
-                majority_result = "위험" if danger_votes > len(self.analysis_history) / 2 else "안전"
+    def _vlm_stage(self, job):
+        if job.error is not None:
+            return job
+        print(f"[{time.strftime('%H:%M:%S')}] 🔍 AI 모델 분석 시작... (#{job.seq})")
+        if self.STREAM_VLM:
+            job.description, job.analysis_time, job.first_alert = self.llm.ollama_describe_stream(
+                job.b64, self.llm.MODEL_NAME, on_hazard=self._on_early_hazard)
+            if job.first_alert is not None:
+                self.time_to_first_alert.add(job.first_alert)
+        else:
+            job.description, job.analysis_time = self.llm.ollama_describe(job.b64, self.llm.MODEL_NAME)
+        self.analysis_time.add(job.analysis_time)
+        job.b64 = None
+        return job
 
-                self.llm.result_q.put_nowait((majority_result, description, analysis_time, time.time()))
-                print(f"📝 AI 분석 결과: {description}")
-                print(f"🎯 안전 판정 - 개별: {individual_result}, 최종: {majority_result}")
-                print(f"⏱️  처리 시간: {analysis_time:.2f}초")
-                print("-" * 60)
+    def _classify_stage(self, job):
+        """정규식 + NLI 분류 후 ts 순서로 되돌려 다수결 (마지막 단계, 예외를 밖으로 내지 않음)"""
+        if job.error is None:
+            try:
+                # 정규식 + 위험 종류별 NLI 배치 점수 (같은 설명이 반복되면 캐시 결과 재사용)
+                job.verdict = self.llm.classify_description(job.description, self.NLI_THRESHOLD)
             except Exception as e:
                 print(f"분석 오류: {e}")
-            finally:
-                frame = None
+                job.error = e
+        ok = job.error is None and not job.description.startswith("이미지 분석 실패")
+        self.scheduler.end(time.monotonic() - job.t0, ok)
+        self.tier_latency["vlm"].add(time.monotonic() - job.t0)
 
+        for done in self._reorder.push(job.seq, job):
+            if done.error is None:
+                # 한 건이 실패해도 같이 풀려난 나머지 결과는 계속 처리
+                try:
+                    self._vote(done)
+                except Exception as e:
+                    print(f"판정 처리 오류 (#{done.seq}): {e}")
+        est = self.scheduler.latency_est
+        print(f"📈 종단 지연 추정 {est:.2f}초 → 다음 분석 주기 {self.scheduler.interval:.1f}초"
+              f" (최소 간격 {self.scheduler.min_gap:.1f}초, 순서 대기 {self._reorder.pending()}건)")
+        print("-" * 60)
+        return None
+
+    def _vote(self, job):
+        verdict = job.verdict
+        # 알림 라벨: NLI 위험 종류 우선, 없으면 키워드 라벨 (같은 스캔에서 이미 산출됨)
+        scores, hazards = verdict["scores"], verdict["hazards"] or verdict["keywords"]
+        individual_result = "위험" if "위험" in (verdict["regex"], verdict["nli"]) else "안전"
+
+        self.analysis_history.append(individual_result)
+        danger_votes = sum(1 for x in self.analysis_history if x == "위험")
+        majority_result = "위험" if danger_votes > len(self.analysis_history) / 2 else "안전"
+
+        self.llm.result_q.put_nowait((majority_result, job.description, job.analysis_time, time.time(), hazards))
+        print(f"📝 AI 분석 결과 (#{job.seq}): {job.description}")
+        print(f"🎯 안전 판정 - 개별: {individual_result}, 최종: {majority_result}")
+        print("🧪 NLI 점수: " + ", ".join(f"{k} {p:.2f}" for k, p in scores.items())
+              + (" (캐시)" if verdict["cached"] else ""))
+        print(f"⏱️  처리 시간: {job.analysis_time:.2f}초")
+
+    def stats(self):
+        """분석 스케줄/게이트 계측값"""
+        return {
+            "scheduler": self.scheduler.stats(),
+            "scene_gate": self.scene_gate.stats(),
+            "verdict_cache": self.llm.verdict_cache.stats(),
+            "early_alerts": self.early_alerts,
+            "time_to_first_alert_ms": self.time_to_first_alert.snapshot(),
+            "analysis_time_ms": self.analysis_time.snapshot(),
+            "alert_dispatch_ms": self.alert_dispatch.snapshot(),
+            "pipeline": {stage.name: stage.stats() for stage in self.stages},
+            "reorder_pending": self._reorder.pending(),
+            "cascade": self._cascade_stats(),
+            "proximity": self.proximity.stats() if self.proximity else None,
+        }
+
+    def _cascade_stats(self):
+        total = sum(self.tier_counts.values())
+        escalated = self.tier_counts["uncertain"] + self.tier_counts["forced"]
+        return {
+            "enabled": self.detector is not None,
+            "counts": dict(self.tier_counts),
+            "escalation_rate": escalated / total if total else 0.0,
+            "detector_ms": self.tier_latency["detector"].snapshot(),
+            "vlm_ms": self.tier_latency["vlm"].snapshot(),
+        }
 
     def _stabilize_camera(self, camera, frames=10):  # <- 파라미터 추가
         """카메라 안정화"""
@@ -155,63 +363,64 @@ class Condition_check:
             except:
                 break
 
-    def _handle_danger_alert(self, description, timestamp):
+    def _on_early_hazard(self, labels, partial, elapsed):
+        """스트리밍 중 확실한 위험이 보이면 설명이 끝나기 전에 이벤트/음성 알림 (다수결 생략)"""
+        self.early_alerts += 1
+        now = time.time()
+        print(f"⚡ 조기 위험 감지 ({elapsed:.2f}초): {', '.join(labels)}")
+        self.safety_events.on_danger_detected(partial, now, early=True)
+        # 최종 판정에서 같은 위험을 다시 말하지 않도록 음성 쿨다운을 공유
+        self._handle_danger_alert(partial, now, labels)
+
+    def _handle_danger_alert(self, description, timestamp, hazards=None):
         """위험 상황 알림 처리"""
-        current_time = time.time()
+        # 조기 알림(VLM worker)과 최종 알림(run 루프)이 동시에 들어와도 쿨다운이 한 번만 통과하도록
+        with self._alert_lock:
+            current_time = time.time()
         
-        if current_time - self.last_voice_alert < self.VOICE_COOLDOWN:
-            return
+            if current_time - self.last_voice_alert < self.VOICE_COOLDOWN:
+                return
         
-        # 🔽 'with' 없이 직접 인스턴스 가져오기
-        speaker = self.hardware_manager.get_speaker()
-        try:
-            danger_keywords = self._extract_danger_keywords(description)
+            # 🔽 'with' 없이 직접 인스턴스 가져오기
+            speaker = self.hardware_manager.get_speaker()
+            try:
+                # 분석 단계에서 넘긴 라벨 우선, 없으면 설명에서 키워드 추출
+                danger_keywords = hazards or self._extract_danger_keywords(description)
             
-            if danger_keywords:
-                voice_message = f"위험이 감지되었습니다. {', '.join(danger_keywords)}가 발견되었습니다. 주의하세요."
-            else:
-                voice_message = "위험한 상황이 감지되었습니다. 주의하세요."
+                if danger_keywords:
+                    voice_message = f"위험이 감지되었습니다. {', '.join(danger_keywords)}가 발견되었습니다. 주의하세요."
+                else:
+                    voice_message = "위험한 상황이 감지되었습니다. 주의하세요."
             
-            print(f"🚨 위험 알림: {voice_message}")
+                print(f"🚨 위험 알림: {voice_message}")
             
-            success = speaker.process(voice_message)
+                success = speaker.process(voice_message, priority=PRIORITY_CRITICAL)
             
-            if success:
-                self.last_voice_alert = current_time
-                print("🔊 음성 알림 출력 완료")
+                if success:
+                    self.last_voice_alert = current_time
+                    self.alert_dispatch.add(time.time() - timestamp)
+                    print("🔊 음성 알림 출력 완료")
                 
-        except Exception as e:
-            print(f"위험 알림 처리 오류: {e}")
+            except Exception as e:
+                print(f"위험 알림 처리 오류: {e}")
 
     def _extract_danger_keywords(self, description):
-        """위험 키워드 추출"""
-        danger_words = []
-        text_lower = description.lower()
-        
-        keyword_map = {
-            'fire': '화재', 'flame': '화염', 'smoke': '연기',
-            'weapon': '무기', 'knife': '칼', 'gun': '총',
-            'explosion': '폭발', 'fall': '낙하', 'danger': '위험',
-            'hazard': '위험요소', 'crash': '충돌', 'collision': '사고'
-        }
-        
-        for eng_word, kor_word in keyword_map.items():
-            if eng_word in text_lower:
-                danger_words.append(kor_word)
-                
-        return danger_words
+        """위험 키워드 추출 (Llm의 컴파일된 매처 한 번 스캔)"""
+        return self.llm.hazard_matcher.scan(description)[1]
 
-    def _cleanup(self, t_capture, t_analyze):
+    def _cleanup(self, t_capture):
         """시스템 정리"""
         print("🔄 시스템 정리 중...")
         
         self.stop_flag = True
         self.llm.stop_flag = True
+        if self.proximity:
+            self.proximity.stop()
         
         if t_capture.is_alive():
             t_capture.join(timeout=3.0)
-        if t_analyze.is_alive():
-            t_analyze.join(timeout=3.0)
+        for stage in self.stages:
+            stage.join(timeout=3.0)
         
         # 리소스 매니저를 통한 정리는 메인에서 처리되므로 제거
         print("✅ 시스템 종료 완료")
\ No newline at end of file
@@ -0,0 +1,145 @@
+import base64
+import threading
+from collections import OrderedDict
+from RSUtils import RSUtils
+
+# 분석용 이미지 공통 인코딩 설정 (VLM 입력, C서버 전송). 소비자들이 같은 설정을 써야 같은 프레임의 인코딩을 공유함
+ANALYSIS_WIDTH = 640
+ANALYSIS_JPEG_QUALITY = 82
+
+
+class _Pending:
+    """진행 중인 인코딩 (같은 키를 기다리는 스레드와 결과 공유)"""
+    __slots__ = ("done", "value", "ok")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.ok = False
+
+
+class FrameEncodeCache:
+    """
+    프레임 인코딩 결과 공유 캐시 (키: 프레임 ts, width, quality, format).
+    - 같은 프레임을 여러 소비자가 같은 설정으로 인코딩하면 1번만 리사이즈/인코딩
+      (설정이 다르면 공유되지 않으므로 분석 경로는 ANALYSIS_WIDTH/ANALYSIS_JPEG_QUALITY를 씀)
+    - width가 프레임 폭과 같으면 리사이즈가 없으므로 원본 크기(None)와 같은 키로 봄
+    - base64 인코딩 때 만든 JPEG도 함께 저장해 JPEG 소비자가 재사용
+    - 동시에 같은 키를 요청하면 먼저 온 쪽이 인코딩하고 나머지는 그 결과를 기다림
+    - 바이트 예산을 넘으면 가장 오래 안 쓴 항목부터 제거(LRU)
+    """
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()     # key -> (value, nbytes)
+        self._inflight = {}             # key -> _Pending
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_encode(self, key, encode_fn):
+        while True:
+            with self._lock:
+                item = self._items.get(key)
+                if item is not None:
+                    self._items.move_to_end(key)
+                    self.hits += 1
+                    return item[0]
+                pending = self._inflight.get(key)
+                if pending is None:
+                    # 이 스레드가 인코딩 담당
+                    pending = _Pending()
+                    self._inflight[key] = pending
+                    self.misses += 1
+                    break
+            # 다른 스레드가 인코딩 중 → 그 결과를 그대로 받음 (실패했으면 직접 다시 시도)
+            pending.done.wait()
+            if pending.ok:
+                with self._lock:
+                    self.hits += 1
+                return pending.value
+
+        try:
+            value = encode_fn()
+            pending.value, pending.ok = value, True
+            with self._lock:
+                self._put(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.done.set()
+
+    def _put(self, key, value):
+        nbytes = len(value)
+        if nbytes > self.max_bytes:
+            return
+        self._items[key] = (value, nbytes)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes:
+            _, (_, n) = self._items.popitem(last=False)
+            self._bytes -= n
+            self.evictions += 1
+
+    @staticmethod
+    def _width(img_bgr, width):
+        return None if width == img_bgr.shape[1] else width
+
+    def jpeg(self, ts, img_bgr, width=None, quality=ANALYSIS_JPEG_QUALITY) -> bytes:
+        """프레임 JPEG 바이트 (ts가 None이면 캐시 없이 인코딩)"""
+        if ts is None:
+            return RSUtils.encode_jpeg(img_bgr, width, quality)
+        width = self._width(img_bgr, width)
+        return self.get_or_encode((ts, width, quality, "jpeg"),
+                                  lambda: RSUtils.encode_jpeg(img_bgr, width, quality))
+
+    def base64_jpeg(self, ts, img_bgr, width=None, quality=ANALYSIS_JPEG_QUALITY) -> str:
+        """VLM 입력용 base64 JPEG 문자열 (같은 설정의 JPEG가 이미 캐시돼 있으면 재사용)"""
+        if ts is None:
+            return RSUtils.to_base64_jpeg(img_bgr, width, quality)
+        width = self._width(img_bgr, width)
+        jpeg_key = (ts, width, quality, "jpeg")
+
+        def encode():
+            # 실제 인코딩 1번 = 미스 1번 (안쪽 JPEG 저장은 따로 세지 않음)
+            jpeg = self._peek(jpeg_key)
+            if jpeg is not None:
+                # 다른 소비자가 이미 인코딩한 JPEG → base64 변환만 하므로 적중으로 셈
+                with self._lock:
+                    self.misses -= 1
+                    self.hits += 1
+            else:
+                jpeg = RSUtils.encode_jpeg(img_bgr, width, quality)
+                with self._lock:
+                    if jpeg_key not in self._items:
+                        self._put(jpeg_key, jpeg)
+            return base64.b64encode(jpeg).decode("ascii")
+        return self.get_or_encode((ts, width, quality, "b64"), encode)
+
+    def _peek(self, key):
+        """통계/LRU 순서를 건드리지 않는 조회"""
+        with self._lock:
+            item = self._items.get(key)
+            return item[0] if item is not None else None
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+encode_cache = FrameEncodeCache()
@@ -0,0 +1,87 @@
+import os
+import time
+import cv2
+import numpy as np
+import torch
+from VIT_DETR_MODEL.models.vit_detection_pretrained import VisionTransformerDetection
+from VIT_DETR_MODEL.utils import load_classes, get_device
+from HardwareSystem.Metrics import LatencyHistogram
+
+
+class HazardDetector:
+    """
+    VIT_DETR_MODEL의 VisionTransformerDetection을 로컬 1차 판정기로 쓰는 래퍼.
+    - 전처리: infer_add_color.preprocess_image와 같은 (img_size 정사각 리사이즈, RGB, mean/std 0.5) 를 cv2로 처리
+    - 후처리: predict()와 같은 softmax → 쿼리별 최고 클래스 → cxcywh를 원본 크기 xyxy로 변환
+    - assess(): 위험 클래스 최고 확률로 danger(확실한 위험) / clear(확실히 없음) / uncertain(VLM 필요) 판정
+    위험 클래스는 hazard_classes로 지정하거나, 없으면 클래스 이름을 HazardMatcher로 검사해 고름.
+    """
+    def __init__(self, weights, classes_path="classes.json", hazard_classes=None, matcher=None,
+                 img_size=224, num_queries=100, score_threshold=0.5, device=None):
+        if not os.path.exists(weights):
+            raise RuntimeError(f"감지기 가중치 파일이 없습니다: {weights}")
+        self.classes = load_classes(classes_path)
+        self.num_classes = len(self.classes)
+        self.img_size = img_size
+        self.score_threshold = score_threshold
+        self.device = device or get_device()
+
+        self.model = VisionTransformerDetection(num_classes=self.num_classes, num_queries=num_queries).to(self.device)
+        self.model.load_state_dict(torch.load(weights, map_location=self.device))
+        self.model.eval()
+
+        if hazard_classes is None:
+            hazard_classes = [c for c in self.classes
+                              if c != "__background__" and matcher is not None
+                              and matcher.is_dangerous(c.replace("_", " "))]
+        self.hazard_ids = [i for i, c in enumerate(self.classes) if c in set(hazard_classes)]
+        if not self.hazard_ids:
+            raise RuntimeError("감지기 클래스 중 위험 클래스가 없습니다 (hazard_classes 지정 필요)")
+        self.hazard_classes = [self.classes[i] for i in self.hazard_ids]
+
+        self.infer_time = LatencyHistogram()
+
+    def _preprocess(self, img_bgr):
+        img = cv2.resize(img_bgr, (self.img_size, self.img_size), interpolation=cv2.INTER_AREA)
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB).astype(np.float32)
+        img = (img / 255.0 - 0.5) / 0.5
+        return torch.from_numpy(img.transpose(2, 0, 1)).to(self.device)
+
+    def _forward(self, img_bgr):
+        """(쿼리별 클래스 확률 [Q, C+1], 원본 크기 xyxy 박스 [Q, 4])"""
+        t0 = time.perf_counter()
+        with torch.no_grad():
+            outputs = self.model([self._preprocess(img_bgr)])
+        probs = torch.softmax(outputs["pred_logits"][0].float().cpu(), dim=-1)
+        boxes = outputs["pred_boxes"][0].float().cpu()
+        self.infer_time.add(time.perf_counter() - t0)
+
+        height, width = img_bgr.shape[:2]
+        cx, cy = boxes[:, 0] * width, boxes[:, 1] * height
+        w, h = boxes[:, 2] * width, boxes[:, 3] * height
+        return probs, torch.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], dim=1)
+
+    def detect(self, img_bgr):
+        """predict()와 같은 필터 (score > score_threshold, 배경 제외) → [(박스, 점수, 클래스 이름)]"""
+        probs, boxes = self._forward(img_bgr)
+        scores, labels = probs.max(-1)
+        keep = (scores > self.score_threshold) & (labels < self.num_classes)
+        return [(b.tolist(), s.item(), self.classes[l.item()])
+                for b, s, l in zip(boxes[keep], scores[keep], labels[keep])]
+
+    def assess(self, img_bgr, danger_threshold=0.8, clear_threshold=0.2):
+        """
+        (판정, [(위험 클래스, 확률)], 위험 최고 확률) 반환. 판정은 "danger" / "clear" / "uncertain".
+        위험 확률은 필터 전 모든 쿼리에서 위험 클래스 확률의 최댓값 (낮은 점수 쿼리도 애매함의 근거가 됨).
+        """
+        probs, _ = self._forward(img_bgr)
+        hazard_probs = probs[:, self.hazard_ids]            # [Q, H]
+        per_class = hazard_probs.max(0).values.tolist()
+        top = max(per_class)
+        hits = sorted(((self.hazard_classes[i], p) for i, p in enumerate(per_class) if p >= danger_threshold),
+                      key=lambda x: -x[1])
+        if top >= danger_threshold:
+            return "danger", hits, top
+        if top < clear_threshold:
+            return "clear", [], top
+        return "uncertain", [], top
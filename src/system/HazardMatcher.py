@@ -0,0 +1,47 @@
+import re
+
+# 위험 판정용 정규식 (하나라도 단어 단위로 맞으면 위험)
+HAZARD_PATTERNS = [
+    # 영어
+    r"\b(flame|blaze|fire|smoke|burn(ing)?\s*object|ignition)\b",
+    r"\b(gun|knife|weapon|explosion|threat)\b",
+    r"\b(fall(ing)?|ladder|no\s*harness|no\s*safety\s*line|at\s*height|construction|danger|hazard)\b",
+    r"\b(crash|collision|overturn|rollover|airbag|wreckage|damaged\s*vehicle)\b",
+]
+
+# 알림 문구용 키워드 → 한국어 라벨 (부분 문자열 일치)
+KEYWORD_LABELS = {
+    'fire': '화재', 'flame': '화염', 'smoke': '연기',
+    'weapon': '무기', 'knife': '칼', 'gun': '총',
+    'explosion': '폭발', 'fall': '낙하', 'danger': '위험',
+    'hazard': '위험요소', 'crash': '충돌', 'collision': '사고'
+}
+
+
+class HazardMatcher:
+    """
+    HAZARD_PATTERNS를 하나의 정규식으로 컴파일하고, 설명을 한 번만 소문자로 바꿔 판정과 라벨을 함께 계산.
+    - 위험 판정: 모든 패턴이 \\b로 시작하면 공통 \\b를 앞으로 빼서 단어 시작 위치에서만 대안을 시도함
+    - 라벨: 기존 _extract_danger_keywords와 같은 부분 문자열 일치, keyword_labels 순서
+      (gunfire → 화재·총, campfire → 화재처럼 단어 중간 일치도 유지. 안전 경로라 누락보다 오탐을 택함)
+    """
+    def __init__(self, patterns=HAZARD_PATTERNS, keyword_labels=KEYWORD_LABELS):
+        self.keyword_labels = dict(keyword_labels)
+        if all(p.startswith(r"\b") for p in patterns):
+            regex = r"\b(?:" + "|".join(f"(?:{p[2:]})" for p in patterns) + ")"
+        else:
+            regex = "|".join(f"(?:{p})" for p in patterns)
+        self._regex = re.compile(regex)
+
+    def scan(self, text: str):
+        """(위험 여부, 한국어 라벨 목록) 반환. 라벨은 keyword_labels 순서, 중복 없음."""
+        text = text.lower()
+        labels = []
+        for kw, label in self.keyword_labels.items():
+            if kw in text and label not in labels:
+                labels.append(label)
+        return self._regex.search(text) is not None, labels
+
+    def is_dangerous(self, text: str) -> bool:
+        """위험 여부만 필요할 때 (첫 위험 패턴에서 바로 종료)"""
+        return self._regex.search(text.lower()) is not None
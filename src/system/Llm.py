@@ -1,29 +1,55 @@
 import queue
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from transformers import AutoConfig, AutoTokenizer, AutoModelForSequenceClassification
 import torch
-import re
 import time
 import ollama
+import os
+from NliBackend import load_nli_backend
+from VerdictCache import VerdictCache, normalize_description
+from HazardMatcher import HazardMatcher, HAZARD_PATTERNS, KEYWORD_LABELS
 class Llm:
-    def __init__(self):
+    def __init__(self, nli_backend: str = None):
         # 설정값
         self.MODEL_NAME = "moondream:latest"   # llava 계열로 바꿔도 동일하게 동작
         self.ADAPTIVE_FACTOR = 1.2             # 인퍼런스 시간 기반 적응 계수
         self.MAJORITY_WINDOW = 5               # 최근 N회 결과 다수결
         self.OLLAMA_TIMEOUT = 25.0             # 초            
         
-        self.HAZARD_PATTERNS = [
-            # 영어
-            r"\b(flame|blaze|fire|smoke|burn(ing)?\s*object|ignition)\b",
-            r"\b(gun|knife|weapon|explosion|threat)\b",
-            r"\b(fall(ing)?|ladder|no\s*harness|no\s*safety\s*line|at\s*height|construction|danger|hazard)\b",
-            r"\b(crash|collision|overturn|rollover|airbag|wreckage|damaged\s*vehicle)\b",
-        ]
+        self.HAZARD_PATTERNS = list(HAZARD_PATTERNS)
+        self.KEYWORD_LABELS = dict(KEYWORD_LABELS)
+        # 위험 패턴 + 키워드를 한 번에 훑는 컴파일된 매처 (판정과 알림 라벨 동시 산출)
+        self.hazard_matcher = HazardMatcher(self.HAZARD_PATTERNS, self.KEYWORD_LABELS)
+        # 스트리밍 중 부분 설명만으로도 즉시 알릴 만큼 확실한 위험 라벨
+        self.EARLY_ALERT_LABELS = {"화재", "화염", "연기", "무기", "칼", "총", "폭발"}
         
         self.NLI_MODEL_NAME = "MoritzLaurer/multilingual-MiniLMv2-L6-mnli-xnli"
+        self.NLI_MODEL_REVISION = None         # None이면 허브 기본 브랜치 (ONNX 캐시 이름엔 실제 커밋 해시를 씀)
+        # NLI 추론 백엔드: torch | int8 | onnx | onnx-int8 (인자 > 환경변수 NLI_BACKEND > torch)
+        self.NLI_BACKEND = nli_backend or os.environ.get("NLI_BACKEND", "torch")
+        # 위험 종류별 NLI 가설 (한국어 라벨 → 가설). 한 번의 배치 추론으로 모두 점수화
+        # "위험"은 종류를 특정하지 않는 일반 가설 (알림 문구의 종류 목록에서는 제외)
+        self.GENERIC_HAZARD = "위험"
+        self.HAZARD_HYPOTHESES = {
+            "위험": "it is dangerous.",
+            "화재": "there is a fire or smoke.",
+            "무기": "someone is holding a weapon.",
+            "낙하": "someone could fall from a height.",
+            "충돌": "a vehicle has crashed.",
+            "공사": "this is a hazardous construction site.",
+        }
         
-        # NLI 모델 로드
-        self.tokenizer, self.nli_model, self.device, self.ENTAIL_IDX, self.CONTRA_IDX, self.NEUTRAL_IDX = self._load_nli()
+        # NLI 모델 로드 (PyTorch 가중치는 torch/int8 백엔드이거나 ONNX export가 필요할 때만 읽음)
+        self.tokenizer, config, self.device, self.ENTAIL_IDX, self.CONTRA_IDX, self.NEUTRAL_IDX = self._load_nli()
+        revision = self.NLI_MODEL_REVISION or getattr(config, "_commit_hash", None)
+        self.nli_runner = load_nli_backend(self.NLI_BACKEND, self._load_nli_model, self.NLI_MODEL_NAME, self.device,
+                                           self.tokenizer.model_input_names, revision=revision)
+        # 추론은 nli_runner만 사용 (int8/onnx에서는 fp32 원본 가중치를 들고 있지 않음)
+        self.nli_model = getattr(self.nli_runner, "model", None)
+        print(f"NLI 백엔드: {self.nli_runner.name} ({self.device})")
+        self._encode_hypotheses()
+        
+        # 같은(정규화 기준) 설명에 대한 정규식/NLI 결과 재사용
+        self.verdict_cache = VerdictCache(maxsize=256, ttl=300.0)
         
         # 큐 및 스레드 관련
         self.frame_q = queue.Queue(maxsize=1)
@@ -31,39 +57,100 @@ class Llm:
         self.stop_flag = False
         
     def _load_nli(self):
-        """NLI 모델을 로드하고 초기화합니다."""
-        tokenizer = AutoTokenizer.from_pretrained(self.NLI_MODEL_NAME)
-        model = AutoModelForSequenceClassification.from_pretrained(self.NLI_MODEL_NAME)
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        if device == "cuda":
-            model = model.half().to(device)
-        id2label = model.config.id2label
+        """NLI 토크나이저/설정을 로드하고 라벨 인덱스를 찾습니다. (모델 가중치는 _load_nli_model)"""
+        tokenizer = AutoTokenizer.from_pretrained(self.NLI_MODEL_NAME, revision=self.NLI_MODEL_REVISION)
+        config = AutoConfig.from_pretrained(self.NLI_MODEL_NAME, revision=self.NLI_MODEL_REVISION)
+        # 양자화/ONNX 백엔드는 CPU fp32 모델을 기준으로 만듦
+        device = "cuda" if torch.cuda.is_available() and self.NLI_BACKEND == "torch" else "cpu"
+        id2label = config.id2label
         label_map_upper = {i: lbl.upper() for i, lbl in id2label.items()}
         entail_idx = [i for i, lbl in label_map_upper.items() if "ENTAIL" in lbl][0]
         contra_idx  = [i for i, lbl in label_map_upper.items() if "CONTRADICT" in lbl][0]
         neutral_idx = [i for i, lbl in label_map_upper.items() if "NEUTRAL" in lbl][0]
-        return tokenizer, model, device, entail_idx, contra_idx, neutral_idx
+        return tokenizer, config, device, entail_idx, contra_idx, neutral_idx
+
+    def _load_nli_model(self):
+        """PyTorch NLI 모델 (CUDA면 fp16). 백엔드가 필요할 때만 호출"""
+        model = AutoModelForSequenceClassification.from_pretrained(self.NLI_MODEL_NAME,
+                                                                   revision=self.NLI_MODEL_REVISION)
+        if self.device == "cuda":
+            model = model.half().to(self.device)
+        return model
         
+    def _encode_hypotheses(self):
+        """가설 쪽 토큰은 고정이므로 초기화 때 한 번만 토크나이즈"""
+        self._hyp_labels = list(self.HAZARD_HYPOTHESES)
+        self._hyp_ids = self.tokenizer([self.HAZARD_HYPOTHESES[k] for k in self._hyp_labels],
+                                       add_special_tokens=False)["input_ids"]
+        # premise 최대 길이 = 모델 최대 길이 - 가장 긴 가설 - 특수 토큰
+        max_len = min(self.tokenizer.model_max_length, 512)
+        self._premise_max = max_len - max(len(h) for h in self._hyp_ids) - self.tokenizer.num_special_tokens_to_add(pair=True)
+
+    def nli_hazard_scores(self, text: str) -> dict:
+        """
+        모든 위험 가설을 배치 1회 forward로 점수화해 {라벨: entailment 확률} 반환.
+        premise만 매 호출 토크나이즈하고, 가설 토큰과 이어 붙여 패딩함.
+        """
+        p_ids = self.tokenizer(text, add_special_tokens=False, truncation=True,
+                               max_length=self._premise_max)["input_ids"]
+        rows = [self.tokenizer.build_inputs_with_special_tokens(p_ids, h) for h in self._hyp_ids]
+        width = max(len(r) for r in rows)
+        pad_id = self.tokenizer.pad_token_id or 0
+        input_ids = torch.full((len(rows), width), pad_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(rows), width), dtype=torch.long)
+        for i, r in enumerate(rows):
+            input_ids[i, :len(r)] = torch.tensor(r, dtype=torch.long)
+            attention_mask[i, :len(r)] = 1
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.tokenizer.model_input_names:
+            token_type_ids = torch.zeros((len(rows), width), dtype=torch.long)
+            for i, h in enumerate(self._hyp_ids):
+                tt = self.tokenizer.create_token_type_ids_from_sequences(p_ids, h)
+                token_type_ids[i, :len(tt)] = torch.tensor(tt, dtype=torch.long)
+            inputs["token_type_ids"] = token_type_ids
+        logits = self.nli_runner.logits(inputs)
+        probs = torch.softmax(logits, dim=-1)[:, self.ENTAIL_IDX].numpy().tolist()
+        return dict(zip(self._hyp_labels, probs))
+
+    def hazard_labels(self, scores: dict, threshold: float = 0.6) -> list:
+        """threshold 이상인 위험 종류 라벨 (점수 높은 순, 일반 가설 제외)"""
+        hits = [(p, k) for k, p in scores.items() if k != self.GENERIC_HAZARD and p >= threshold]
+        return [k for p, k in sorted(hits, reverse=True)]
+
     def classify_text_regex(self, text: str) -> str:
         """정규표현식을 사용하여 텍스트를 위험/안전으로 분류합니다."""
-        t = text.lower()
-        for p in self.HAZARD_PATTERNS:
-            if re.search(p, t):
-                return "위험"
-        return "안전"
+        return "위험" if self.hazard_matcher.is_dangerous(text) else "안전"
         
     def nli_danger(self, text: str, threshold: float = 0.6) -> str:
-        """NLI 모델을 사용하여 텍스트가 위험한지 판단합니다."""
-        premise = text
-        hypothesis = "it is dangerous."
-        inputs = self.tokenizer(premise, hypothesis, return_tensors="pt", truncation=True)
-        if self.device == "cuda":
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-        with torch.no_grad():
-            logits = self.nli_model(**inputs).logits.squeeze(0)
-            probs = torch.softmax(logits, dim=-1).float().cpu().numpy().tolist()
-        return "위험" if probs[self.ENTAIL_IDX] >= threshold else "안전"
+        """NLI 모델을 사용하여 텍스트가 위험한지 판단합니다. (가설 중 하나라도 threshold 이상이면 위험)"""
+        scores = self.nli_hazard_scores(text)
+        return "위험" if max(scores.values()) >= threshold else "안전"
+
 
+    def classify_description(self, text: str, threshold: float = 0.6) -> dict:
+        """
+        설명 한 건의 정규식 판정 + NLI 위험별 점수를 계산(또는 캐시에서 반환).
+        반환: regex, keywords(키워드 라벨), nli, scores, hazards(threshold 이상 라벨), cached
+        """
+        key = normalize_description(text)
+        cached = self.verdict_cache.get(key)
+        if cached is None:
+            t0 = time.perf_counter()
+            danger, keywords = self.hazard_matcher.scan(text)
+            cached = ("위험" if danger else "안전", keywords, self.nli_hazard_scores(text))
+            self.verdict_cache.put(key, cached, cost=time.perf_counter() - t0)
+            hit = False
+        else:
+            hit = True
+        regex_result, keywords, scores = cached
+        return {
+            "regex": regex_result,
+            "keywords": keywords,
+            "nli": "위험" if max(scores.values()) >= threshold else "안전",
+            "scores": scores,
+            "hazards": self.hazard_labels(scores, threshold),
+            "cached": hit,
+        }
 
     def ollama_describe(self, b64jpg: str, model: str, timeout: float = None) -> tuple[str, float]:
         if timeout is None:
@@ -84,4 +171,57 @@ class Llm:
         except Exception as e:
             took = time.time() - start
             print(f"Ollama 분석 오류: {e}")
-            return f"이미지 분석 실패: {str(e)}", took
\ No newline at end of file
+            return f"이미지 분석 실패: {str(e)}", took
+
+    def ollama_describe_stream(self, b64jpg: str, model: str, timeout: float = None,
+                               on_hazard=None) -> tuple[str, float, float]:
+        """
+        ollama_describe의 스트리밍 버전. 토큰이 오는 대로 설명을 이어 붙이고, 완성된 단어까지의
+        부분 설명을 hazard_matcher로 검사해 EARLY_ALERT_LABELS에 해당하는 위험이 보이면
+        on_hazard(labels, partial_text, elapsed)를 한 번 호출함 (나머지 설명은 계속 받음).
+        반환: (전체 설명, 총 소요 시간, 첫 알림까지 시간 또는 None)
+        """
+        if timeout is None:
+            timeout = self.OLLAMA_TIMEOUT
+        start = time.time()
+        parts = []
+        first_alert = None
+        scanned = 0
+        try:
+            stream = ollama.chat(
+                model=model,
+                messages=[{
+                    "role": "user",
+                    "content": "Describe this image briefly and factually.",
+                    "images": [b64jpg]
+                }],
+                options={"timeout": timeout},
+                stream=True
+            )
+            for chunk in stream:
+                piece = chunk["message"]["content"]
+                if not piece:
+                    continue
+                parts.append(piece)
+                if on_hazard is None or first_alert is not None:
+                    continue
+                text = "".join(parts)
+                # 마지막 단어는 아직 이어질 수 있으므로 (fire → fireplace) 구분자 앞까지만 검사
+                cut = max(text.rfind(c) for c in " .,;\n")
+                if cut <= scanned:
+                    continue
+                scanned = cut
+                danger, labels = self.hazard_matcher.scan(text[:cut])
+                strong = [l for l in labels if l in self.EARLY_ALERT_LABELS]
+                if danger and strong:
+                    first_alert = time.time() - start
+                    try:
+                        on_hazard(strong, text[:cut], first_alert)
+                    except Exception as e:
+                        print(f"조기 위험 알림 오류: {e}")
+            took = time.time() - start
+            return "".join(parts), took, first_alert
+        except Exception as e:
+            took = time.time() - start
+            print(f"Ollama 분석 오류: {e}")
+            return f"이미지 분석 실패: {str(e)}", took, first_alert
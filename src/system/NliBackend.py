@@ -0,0 +1,103 @@
+import os
+import re
+import torch
+
+try:
+    import onnxruntime as ort
+except ImportError:  # onnx 백엔드를 쓰지 않으면 없어도 됨
+    ort = None
+
+# 선택 가능한 NLI 추론 백엔드
+#  - torch      : 기본 PyTorch (CUDA면 fp16, CPU면 fp32)
+#  - int8       : PyTorch dynamic int8 양자화 (Linear 층, CPU 전용)
+#  - onnx       : ONNX Runtime 세션 (export 결과를 파일로 캐시)
+#  - onnx-int8  : ONNX 모델을 dynamic int8 양자화한 세션 (역시 파일 캐시)
+BACKENDS = ("torch", "int8", "onnx", "onnx-int8")
+ONNX_OPSET = 14
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "4youreyes", "nli")
+
+
+class TorchNli:
+    """PyTorch 모델 래퍼. logits(inputs) → (B, 3) float32 텐서(CPU)"""
+    def __init__(self, model, device, quantize=False):
+        self.device = device
+        if quantize:
+            if device != "cpu":
+                raise RuntimeError("int8 백엔드는 CPU에서만 지원됩니다")
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model.eval()
+        self.name = "int8" if quantize else "torch"
+
+    def logits(self, inputs):
+        if self.device == "cuda":
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        with torch.no_grad():
+            return self.model(**inputs).logits.float().cpu()
+
+
+class OnnxNli:
+    """
+    ONNX Runtime 세션 래퍼. 모델 파일이 없을 때만 PyTorch 모델을 load_model()로 읽어 export(및 양자화) 수행.
+    캐시 파일 이름에 모델 리비전과 opset을 넣어, 모델이 바뀌면 예전 export를 다시 쓰지 않음.
+    """
+    def __init__(self, load_model, model_name, input_names, cache_dir=None, quantize=False, threads=None,
+                 revision=None):
+        if ort is None:
+            raise RuntimeError("onnxruntime이 설치되지 않았습니다 (pip install onnxruntime)")
+        cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        os.makedirs(cache_dir, exist_ok=True)
+        stem = f"{model_name}@{revision or 'main'}.opset{ONNX_OPSET}"
+        base = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.@-]+", "_", stem))
+        path = base + ".onnx"
+        if not os.path.exists(path):
+            self.export(load_model(), input_names, path)
+        if quantize:
+            qpath = base + ".int8.onnx"
+            if not os.path.exists(qpath):
+                from onnxruntime.quantization import quantize_dynamic, QuantType
+                quantize_dynamic(path, qpath, weight_type=QuantType.QInt8)
+                print(f"ONNX int8 양자화 모델 저장: {qpath}")
+            path = qpath
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            opts.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.path = path
+        self.name = "onnx-int8" if quantize else "onnx"
+
+    @staticmethod
+    def export(model, input_names, path):
+        """동적 배치/시퀀스 축으로 export (임시 파일에 쓴 뒤 교체해 반쯤 쓰인 캐시를 남기지 않음)"""
+        model = model.float().cpu().eval()
+        # 그래프 입력 순서는 forward 인자 순서를 따르므로 그 순서로 맞춰 이름을 붙임
+        input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in input_names]
+        dummy = ({n: torch.ones((2, 16), dtype=torch.long) for n in input_names},)
+        axes = {n: {0: "batch", 1: "seq"} for n in input_names}
+        axes["logits"] = {0: "batch"}
+        tmp = path + ".tmp"
+        with torch.no_grad():
+            torch.onnx.export(model, dummy, tmp, input_names=list(input_names), output_names=["logits"],
+                              dynamic_axes=axes, opset_version=ONNX_OPSET)
+        os.replace(tmp, path)
+        print(f"ONNX NLI 모델 저장: {path}")
+
+    def logits(self, inputs):
+        feed = {k: v.cpu().numpy() for k, v in inputs.items() if k in self.input_names}
+        return torch.from_numpy(self.session.run(["logits"], feed)[0]).float()
+
+
+def load_nli_backend(name, load_model, model_name, device, input_names, cache_dir=None, threads=None,
+                     revision=None):
+    """
+    name에 맞는 백엔드 생성. onnx 계열은 CPU 실행만 지원.
+    load_model()은 PyTorch 모델을 읽는 함수로, onnx 계열은 캐시된 export가 없을 때만 호출함.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 NLI 백엔드: {name} (가능: {', '.join(BACKENDS)})")
+    if name in ("torch", "int8"):
+        return TorchNli(load_model(), device, quantize=(name == "int8"))
+    return OnnxNli(load_model, model_name, input_names, cache_dir=cache_dir,
+                   quantize=(name == "onnx-int8"), threads=threads, revision=revision)
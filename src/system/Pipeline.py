@@ -0,0 +1,131 @@
+import heapq
+import queue
+import threading
+import time
+from HardwareSystem.Metrics import LatencyHistogram
+
+
+class Stage:
+    """
+    bounded 큐로 이어지는 파이프라인 단계 1개 (workers개 스레드).
+    - in_q에서 꺼내 fn(item) 결과를 out_q에 넣음 (out_q가 가득 차면 기다려서 앞 단계에 역압 전달)
+    - fn이 예외를 내면 item.error에 기록해 그대로 다음 단계로 넘김 (순서 복원이 끊기지 않도록)
+      item이 error 속성이 없는 값(튜플 등)이면 기록할 수 없으므로 버리고 on_drop(item, e)을 호출
+    - fn이 None을 반환하면 아무것도 넘기지 않음 (마지막 단계)
+    """
+    def __init__(self, name, fn, in_q, out_q=None, workers=1, stop=None, on_drop=None):
+        self.name = name
+        self.fn = fn
+        self.on_drop = on_drop
+        self.in_q = in_q
+        self.out_q = out_q
+        self.workers = workers
+        self._stop = stop or (lambda: False)
+        self._threads = []
+        self._lock = threading.Lock()
+
+        # 계측
+        self.processed = 0
+        self.errors = 0
+        self.dropped = 0
+        self.busy = 0.0                 # 전 worker 처리 시간 합(초)
+        self.active = 0                 # 지금 처리 중인 worker 수
+        self.process_time = LatencyHistogram()
+        self._started = None
+
+    def start(self):
+        self._started = time.monotonic()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def join(self, timeout=None):
+        for t in self._threads:
+            if t.is_alive():
+                t.join(timeout=timeout)
+
+    def _run(self):
+        while not self._stop():
+            try:
+                item = self.in_q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            with self._lock:
+                self.active += 1
+            t0 = time.perf_counter()
+            try:
+                out = self.fn(item)
+            except Exception as e:
+                print(f"{self.name} 단계 오류: {e}")
+                with self._lock:
+                    self.errors += 1
+                out = self._fail(item, e)
+            dt = time.perf_counter() - t0
+            with self._lock:
+                self.active -= 1
+                self.processed += 1
+                self.busy += dt
+            self.process_time.add(dt)
+            if out is not None and self.out_q is not None:
+                self._put(out)
+
+    def _fail(self, item, e):
+        """실패한 item을 다음 단계로 넘길 값 (error를 기록할 수 없으면 버리고 None)"""
+        if hasattr(item, "error"):
+            item.error = e
+            return item
+        with self._lock:
+            self.dropped += 1
+        if self.on_drop is not None:
+            try:
+                self.on_drop(item, e)
+            except Exception as drop_error:
+                print(f"{self.name} 단계 on_drop 오류: {drop_error}")
+        return None
+
+    def _put(self, item):
+        while not self._stop():
+            try:
+                self.out_q.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def stats(self):
+        with self._lock:
+            elapsed = time.monotonic() - self._started if self._started else 0.0
+            return {
+                "workers": self.workers,
+                "queue_depth": self.in_q.qsize(),
+                "active": self.active,
+                "processed": self.processed,
+                "errors": self.errors,
+                "dropped": self.dropped,
+                "busy_s": self.busy,
+                # worker 전체 시간 중 실제 처리에 쓴 비율 (1에 가까우면 이 단계가 병목)
+                "utilization": self.busy / (elapsed * self.workers) if elapsed else 0.0,
+                "process_ms": self.process_time.snapshot(),
+            }
+
+
+class Reorderer:
+    """순번(seq)이 뒤섞여 도착하는 결과를 0, 1, 2... 순서대로 내보냄"""
+    def __init__(self):
+        self._heap = []
+        self._next = 0
+        self.max_pending = 0
+
+    def push(self, seq, item):
+        """item을 넣고, 이제 순서대로 내보낼 수 있게 된 항목들을 반환"""
+        heapq.heappush(self._heap, (seq, item))
+        self.max_pending = max(self.max_pending, len(self._heap))
+        ready = []
+        while self._heap and self._heap[0][0] == self._next:
+            ready.append(heapq.heappop(self._heap)[1])
+            self._next += 1
+        return ready
+
+    def pending(self):
+        return len(self._heap)
@@ -0,0 +1,161 @@
+import time
+from HardwareSystem.HardwareResourceManager import StreamProfile
+from HardwareSystem.Metrics import LatencyHistogram
+from HardwareSystem.Tts import PRIORITY_CRITICAL
+from RSUtils import RSUtils
+
+
+class _ZoneState:
+    __slots__ = ("near", "clear", "active", "last_alert")
+
+    def __init__(self):
+        self.near = 0          # 연속 근접 프레임 수
+        self.clear = 0         # 연속 해제 프레임 수
+        self.active = False
+        self.last_alert = 0.0
+
+
+class ProximityDetector:
+    """
+    depth 프레임만으로 좌/정면/우 구역별 가장 가까운 장애물 거리를 계산해 근접 위험을 알림.
+    - 허브 콜백 구독(depth만, 정렬 없음)으로 15~30fps 처리, LLM 경로와 독립
+    - 구역 거리: 화면 중간 띠(band)를 stride 간격으로 줄인 뒤 유효 픽셀의 하위 percentile
+    - 디바운스: trigger_frames 연속 근접 시 알림, near_m+clear_margin_m 밖으로 clear_frames 연속이면 해제
+      (유효 픽셀이 부족한 프레임은 근접/해제 어느 쪽으로도 세지 않음)
+    """
+    ZONES = ("left", "center", "right")
+    ZONE_NAMES = {"left": "왼쪽", "center": "정면", "right": "오른쪽"}
+
+    def __init__(self, hardware_manager, safety_events, fps=15, near_m=1.0, clear_margin_m=0.2,
+                 trigger_frames=3, clear_frames=5, repeat_interval=5.0, stride=4, band=(0.2, 0.8),
+                 percentile=5, min_valid_ratio=0.2, speak=True):
+        self.hardware_manager = hardware_manager
+        self.safety_events = safety_events
+        self.fps = fps
+        self.near_m = near_m
+        self.clear_margin_m = clear_margin_m
+        self.trigger_frames = trigger_frames
+        self.clear_frames = clear_frames
+        self.repeat_interval = repeat_interval
+        self.stride = stride
+        self.band = band
+        self.percentile = percentile
+        self.min_valid_ratio = min_valid_ratio
+        self.speak = speak
+
+        self.depth_scale = None
+        self.latest = {}             # zone -> (거리 m, 유효 비율)
+        self._state = {z: _ZoneState() for z in self.ZONES}
+        self._sub = None
+        self._speaker = None
+
+        # 계측
+        self.frames = 0
+        self.events = 0
+        self.process_time = LatencyHistogram()     # 프레임 1장 처리 시간
+        self.alert_latency = LatencyHistogram()    # 캡처 → 알림 발생까지
+
+    def start(self):
+        if self._sub is not None:
+            return
+        hub = self.hardware_manager.get_camera()
+        self.depth_scale = hub.get_info()["depth_scale"] or 0.001
+        if self.speak:
+            # 첫 알림 때 허브 스레드에서 pygame 초기화가 일어나지 않도록 미리 준비
+            self._speaker = self.hardware_manager.get_speaker()
+        self._sub = hub.subscribe(maxlen=1, profile=StreamProfile.depth_only(fps=self.fps),
+                                  callback=self._on_frame, name="proximity")
+        print(f"근접 장애물 감지 시작 ({self.fps}fps, 기준 {self.near_m:.1f}m)")
+
+    def stop(self):
+        if self._sub is not None:
+            self._sub.close()
+            self._sub = None
+
+    def zone_distances(self, depth_z16):
+        """[(거리 m, 유효 비율)] 좌/정면/우 순서. 유효 픽셀이 없으면 거리 NaN."""
+        h = depth_z16.shape[0]
+        y1, y2 = int(h * self.band[0]), int(h * self.band[1])
+        d = depth_z16[y1:y2:self.stride, ::self.stride]
+        zw = d.shape[1] // len(self.ZONES)
+        key = f"p{self.percentile}"
+        out = []
+        for i in range(len(self.ZONES)):
+            st = RSUtils.roi_distance_stats(d[:, i * zw:(i + 1) * zw], self.depth_scale,
+                                            percentiles=(self.percentile,))
+            out.append((st[key], st["valid_ratio"]))
+        return out
+
+    def _on_frame(self, ref):
+        """허브 콜백 (허브 스레드에서 실행되므로 짧게 처리)"""
+        if ref.depth is None:
+            return
+        t0 = time.perf_counter()
+        self.frames += 1
+        now = time.time()
+        fired = []
+        for zone, (dist, valid) in zip(self.ZONES, self.zone_distances(ref.depth)):
+            self.latest[zone] = (dist, valid)
+            if self._update_zone(self._state[zone], dist, valid, now):
+                fired.append((zone, dist))
+        self.process_time.add(time.perf_counter() - t0)
+
+        if fired:
+            zone, dist = min(fired, key=lambda z: z[1])
+            self._alert(zone, dist, ref.ts)
+
+    def _update_zone(self, st, dist, valid, now):
+        """
+        디바운스 상태 갱신. 알림을 보내야 하면 True.
+        유효 픽셀이 부족하거나 거리가 NaN인 프레임은 상태를 그대로 유지
+        (D435 최소 거리보다 가까운 장애물은 depth 0으로 읽혀 무효가 되므로 해제로 세면 안 됨)
+        """
+        trusted = valid >= self.min_valid_ratio and dist == dist   # NaN 제외
+        if not trusted:
+            return False
+        near = dist < self.near_m
+        if near:
+            st.near += 1
+            st.clear = 0
+        elif dist >= self.near_m + self.clear_margin_m:
+            st.clear += 1
+            st.near = 0
+        else:
+            st.near = 0                # near_m ~ near_m+clear_margin_m: 해제도 근접도 아님
+
+        if not st.active:
+            if st.near >= self.trigger_frames:
+                st.active = True
+                st.last_alert = now
+                return True
+            return False
+
+        if st.clear >= self.clear_frames:
+            st.active = False
+            return False
+        # 장애물이 계속 가까이 있으면 주기적으로 다시 알림
+        if near and now - st.last_alert >= self.repeat_interval:
+            st.last_alert = now
+            return True
+        return False
+
+    def _alert(self, zone, dist, frame_ts):
+        self.events += 1
+        self.safety_events.on_proximity_detected(zone, dist, frame_ts)
+        self.alert_latency.add(time.time() - frame_ts)
+        message = f"{self.ZONE_NAMES[zone]} {dist:.1f}미터 앞에 장애물이 있습니다."
+        print(f"🚧 근접 경고: {message}")
+        if self._speaker is not None:
+            try:
+                self._speaker.process(message, priority=PRIORITY_CRITICAL)
+            except Exception as e:
+                print(f"근접 알림 음성 출력 오류: {e}")
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "events": self.events,
+            "latest": dict(self.latest),
+            "process_ms": self.process_time.snapshot(),
+            "alert_latency_ms": self.alert_latency.snapshot(),
+        }
@@ -0,0 +1,116 @@
+import base64
+import cv2
+import numpy as np
+
+
+class RSUtils:
+    # (w, h, fx, fy, ppx, ppy) → 픽셀별 정규화 광선 (x-ppx)/fx, (y-ppy)/fy
+    _ray_cache = {}
+
+    @staticmethod
+    def encode_jpeg(img_bgr: np.ndarray, width: int = None, quality: int = 90) -> bytes:
+        """width로 비율 유지 리사이즈(None이면 원본 크기) 후 JPEG 바이트 반환"""
+        h, w = img_bgr.shape[:2]
+        if width and w != width:
+            scale = width / w
+            img_bgr = cv2.resize(img_bgr, (width, int(h*scale)), interpolation=cv2.INTER_AREA)
+        ok, buf = cv2.imencode(".jpg", img_bgr, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+        if not ok:
+            raise RuntimeError("JPEG 인코딩 실패")
+        return buf.tobytes()
+
+    @staticmethod
+    def to_base64_jpeg(img_bgr: np.ndarray, width: int, quality: int) -> str:
+        return base64.b64encode(RSUtils.encode_jpeg(img_bgr, width, quality)).decode("ascii")
+
+    @staticmethod
+    def depth_to_xyz(x, y, depth_z16: np.ndarray, intrin, depth_scale: float):
+        """픽셀(x,y)에서 3D 좌표(m) 계산 (z16*scale 사용). z가 0이면 NaN."""
+        z = float(depth_z16[y, x]) * depth_scale
+        if z <= 0: return (np.nan, np.nan, 0.0)
+        fx, fy, ppx, ppy = intrin.fx, intrin.fy, intrin.ppx, intrin.ppy
+        X = (x - ppx) * z / fx
+        Y = (y - ppy) * z / fy
+        return (X, Y, z)
+
+    @staticmethod
+    def _pixel_rays(intrin, width, height):
+        """내부파라미터별로 1회만 계산해 두는 x/y 광선 (브로드캐스트용 1행/1열)"""
+        key = (width, height, intrin.fx, intrin.fy, intrin.ppx, intrin.ppy)
+        rays = RSUtils._ray_cache.get(key)
+        if rays is None:
+            rx = ((np.arange(width, dtype=np.float32) - intrin.ppx) / intrin.fx)[None, :]
+            ry = ((np.arange(height, dtype=np.float32) - intrin.ppy) / intrin.fy)[:, None]
+            rays = (rx, ry)
+            RSUtils._ray_cache[key] = rays
+        return rays
+
+    @staticmethod
+    def depth_frame_to_xyz(depth_z16: np.ndarray, intrin, depth_scale: float, mask: np.ndarray = None) -> np.ndarray:
+        """
+        depth 프레임 전체(또는 mask 픽셀)를 한 번에 3D 좌표(m)로 변환 (depth_to_xyz의 벡터화 버전).
+        - mask 없음: (H, W, 3) float32
+        - mask 있음: (N, 3) float32, N = mask의 True 개수 (행 우선 순서)
+        z가 0인 픽셀은 depth_to_xyz와 같이 (NaN, NaN, 0).
+        intrin/depth_scale은 hub.get_info()의 depth_intrinsics/depth_scale 사용.
+        """
+        h, w = depth_z16.shape[:2]
+        rx, ry = RSUtils._pixel_rays(intrin, w, h)
+        if mask is None:
+            z = depth_z16.astype(np.float32)
+            z *= depth_scale
+            xyz = np.empty((h, w, 3), dtype=np.float32)
+            np.multiply(z, rx, out=xyz[..., 0])
+            np.multiply(z, ry, out=xyz[..., 1])
+            xyz[..., 2] = z
+            invalid = z <= 0
+        else:
+            ys, xs = np.nonzero(mask)
+            z = depth_z16[ys, xs].astype(np.float32)
+            z *= depth_scale
+            xyz = np.empty((z.size, 3), dtype=np.float32)
+            np.multiply(z, rx[0, xs], out=xyz[:, 0])
+            np.multiply(z, ry[ys, 0], out=xyz[:, 1])
+            xyz[:, 2] = z
+            invalid = z <= 0
+        xyz[invalid, 0] = np.nan
+        xyz[invalid, 1] = np.nan
+        return xyz
+
+    @staticmethod
+    def roi_distance_stats(depth_z16: np.ndarray, depth_scale: float, roi=None, mask: np.ndarray = None,
+                           percentiles=(10, 50, 90)) -> dict:
+        """
+        ROI(x1, y1, x2, y2) 또는 mask 영역의 거리(m) 통계. 0(측정 실패) 픽셀은 제외.
+        반환: valid_ratio(유효 픽셀 비율), median, min, p{N} (유효 픽셀이 없으면 NaN)
+        percentile은 z16 정수값에서 바로 구한 뒤 스케일만 곱함 (float 변환 없음).
+        """
+        if mask is not None:
+            d = depth_z16[mask]
+        elif roi is not None:
+            x1, y1, x2, y2 = roi
+            d = depth_z16[y1:y2, x1:x2]
+        else:
+            d = depth_z16
+        total = d.size
+        valid = d[d > 0]
+
+        stats = {"valid_ratio": valid.size / total if total else 0.0}
+        keys = ["median"] + [f"p{p}" for p in percentiles]
+        if valid.size == 0:
+            stats["min"] = np.nan
+            stats.update({k: np.nan for k in keys})
+            return stats
+        qs = np.percentile(valid, [50] + list(percentiles))
+        stats["min"] = float(valid.min()) * depth_scale
+        stats.update({k: float(q) * depth_scale for k, q in zip(keys, qs)})
+        return stats
+
+    @staticmethod
+    def overlay_distances(image_bgr, triplet_xyz, color=(0,255,0)):
+        (cx,cy,cz), (lx,ly,lz), (rx,ry,rz) = triplet_xyz
+        pairs = [(f"Center: {cz:.2f} m", (10, 30)),
+                 (f"Left:   {lz:.2f} m", (10, 60)),
+                 (f"Right:  {rz:.2f} m", (10, 90))]
+        for text, pos in pairs:
+            cv2.putText(image_bgr, text, pos, cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
@@ -4,15 +4,18 @@ class SafetyEventHandler:
     def __init__(self):
         self.danger_event = threading.Event()
         self.safe_event = threading.Event()
+        self.proximity_event = threading.Event()
         self.latest_info = {}
         self._lock = threading.Lock()
     
-    def on_danger_detected(self, description, timestamp):
+    def on_danger_detected(self, description, timestamp, early=False):
+        """early=True: 스트리밍 부분 설명만으로 먼저 알린 경우 (다수결 이전)"""
         with self._lock:
             self.latest_info = {
                 'type': 'danger',
                 'description': description,
-                'timestamp': timestamp
+                'timestamp': timestamp,
+                'early': early
             }
             self.danger_event.set()
             self.safe_event.clear()
@@ -23,6 +26,17 @@ class SafetyEventHandler:
             self.safe_event.set()
             self.danger_event.clear()
     
+    def on_proximity_detected(self, zone, distance, timestamp):
+        """depth 기반 근접 장애물 (LLM 판정과 독립적으로 발생)"""
+        with self._lock:
+            self.latest_info = {
+                'type': 'proximity',
+                'zone': zone,
+                'distance': distance,
+                'timestamp': timestamp
+            }
+            self.proximity_event.set()
+    
     def get_latest_info(self):
         with self._lock:
             return self.latest_info.copy()
@@ -0,0 +1,93 @@
+import cv2
+import numpy as np
+
+
+class SceneChangeGate:
+    """
+    축소 grayscale 블록 차이로 VLM 분석 여부를 결정하는 게이트.
+    - 시그니처: 프레임을 grid(기본 16x12) 블록 평균 밝기로 축소 (전체 밝기 변화는 평균을 빼서 무시)
+    - 변화 점수: 마지막 분석 프레임 대비 block_threshold 이상 바뀐 블록 비율 (0~1)
+    판정 (경과 시간 = 마지막 분석 이후):
+      - min_interval 이전: 항상 건너뜀
+      - 점수 >= large_change: 즉시 분석 (조기 트리거)
+      - max_interval 경과: 변화가 없어도 분석 (주기 갱신)
+      - nominal_interval 경과 + 점수 >= small_change: 분석
+      - 그 외: 건너뜀 (고정 주기였다면 호출됐을 분석은 saved로 집계)
+    """
+    def __init__(self, min_interval=5.0, nominal_interval=20.0, max_interval=60.0,
+                 small_change=0.05, large_change=0.3, grid=(16, 12), block_threshold=12.0):
+        self.min_interval = min_interval
+        self.nominal_interval = nominal_interval
+        self.max_interval = max_interval
+        self.small_change = small_change
+        self.large_change = large_change
+        self.grid = grid
+        self.block_threshold = block_threshold
+
+        self._ref_sig = None
+        self._last_t = None
+        self._next_nominal = None
+
+        # 계측
+        self.frames_seen = 0
+        self.analyses = 0
+        self.early_triggers = 0      # 큰 변화로 nominal 주기보다 먼저 분석
+        self.forced = 0              # max_interval 경과로 분석
+        self.saved = 0               # 고정 주기였다면 실행됐을 VLM 호출 중 건너뛴 횟수
+        self.last_score = 0.0
+
+    def signature(self, img_bgr):
+        gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY) if img_bgr.ndim == 3 else img_bgr
+        small = cv2.resize(gray, self.grid, interpolation=cv2.INTER_AREA).astype(np.float32)
+        small -= small.mean()
+        return small
+
+    def change_score(self, sig):
+        if self._ref_sig is None:
+            return 1.0
+        return float(np.count_nonzero(np.abs(sig - self._ref_sig) >= self.block_threshold)) / sig.size
+
+    def should_analyze(self, img_bgr, now):
+        """(분석 여부, 사유) 반환. True면 이 프레임을 기준 프레임으로 기록함."""
+        self.frames_seen += 1
+        if self._last_t is not None and now - self._last_t < self.min_interval:
+            return False, "min_interval"
+
+        sig = self.signature(img_bgr)
+        score = self.change_score(sig)
+        self.last_score = score
+
+        if self._last_t is None:
+            reason = "first"
+        elif score >= self.large_change:
+            elapsed = now - self._last_t
+            reason = "large_change"
+            if elapsed < self.nominal_interval:
+                self.early_triggers += 1
+        elif now - self._last_t >= self.max_interval:
+            reason = "max_interval"
+            self.forced += 1
+        elif now - self._last_t >= self.nominal_interval and score >= self.small_change:
+            reason = "changed"
+        else:
+            # 고정 주기 기준으로 분석 시점이 지났는데 건너뛴 경우만 절약으로 집계
+            while self._next_nominal is not None and now >= self._next_nominal:
+                self.saved += 1
+                self._next_nominal += self.nominal_interval
+            return False, "static"
+
+        self._ref_sig = sig
+        self._last_t = now
+        self._next_nominal = now + self.nominal_interval
+        self.analyses += 1
+        return True, reason
+
+    def stats(self):
+        return {
+            "frames_seen": self.frames_seen,
+            "analyses": self.analyses,
+            "early_triggers": self.early_triggers,
+            "forced": self.forced,
+            "vlm_calls_saved": self.saved,
+            "last_score": self.last_score,
+        }
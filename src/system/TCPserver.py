@@ -1,6 +1,7 @@
-from HardwareSystem.HardwareResourceManager import HardwareResourceManager, VoiceCommandHandler
+from HardwareSystem.HardwareResourceManager import HardwareResourceManager, VoiceCommandHandler, StreamProfile
 from HardwareSystem.BaseApp import time
 from SafetyEventHandler import safety_events
+from EncodeCache import encode_cache, ANALYSIS_WIDTH, ANALYSIS_JPEG_QUALITY
 from HardwareSystem.HardwareResourceManager import hardware_manager
 import socket
 import re
@@ -39,30 +40,27 @@ class PersistentTCPServer:
         
         image_bytes = None
         hub = self.hardware_manager.get_camera()
-        q = hub.subscribe(maxlen=1)
+        # C서버 전송은 color 한 장이면 충분 → depth/정렬 생략
+        sub = hub.subscribe(maxlen=1, profile=StreamProfile.color_only(), name="tcp_capture")
         try:
-            t0 = time.time()
-            frame = None
-            while time.time() - t0 < 2.0:
-                if q:
-                    _, color_bgr, _ = q[-1]
-                    frame = color_bgr
-                    break
-                time.sleep(0.01)
-
-            if frame is None:
+            # 최대 2초간 첫 프레임을 블로킹 대기
+            ref = sub.get(timeout=2.0)
+            if ref is None:
                 print("❌ 작업 실패: 프레임을 받지 못했습니다.")
                 return False
 
-            # 🔽 1. 디스크에 저장하는 대신 메모리에서 바로 JPEG로 인코딩
-            ok, buf = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), 90])
-            if not ok:
-                print("🔥 [오류] JPEG 인코딩 실패")
-                return False
-            image_bytes = buf.tobytes()
+            # 🔽 1. 디스크에 저장하는 대신 메모리에서 바로 JPEG로 인코딩 (인코딩 후 링 슬롯 반환)
+            #    VLM 분석과 같은 설정으로 인코딩해, 분석 중인 프레임이면 그 결과를 재사용
+            with ref:
+                ts, frame, _ = ref
+                try:
+                    image_bytes = encode_cache.jpeg(ts, frame, ANALYSIS_WIDTH, ANALYSIS_JPEG_QUALITY)
+                except RuntimeError:
+                    print("🔥 [오류] JPEG 인코딩 실패")
+                    return False
 
         finally:
-            hub.unsubscribe(q)
+            hub.unsubscribe(sub)
 
         # 제3서버에 인증 및 이미지 전송
         # 2. 제3서버에 인증 및 이미지 전송 (파일 읽기 과정이 사라짐)
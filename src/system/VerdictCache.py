@@ -0,0 +1,72 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_description(text: str) -> str:
+    """캐시 키용 정규화: 소문자 + 공백 연속을 한 칸으로"""
+    return _WS.sub(" ", text.lower()).strip()
+
+
+class VerdictCache:
+    """
+    VLM 설명 → (정규식 판정, NLI 위험별 점수) 메모 캐시.
+    - 키: normalize_description(설명). 정적인 장면에서 같은 설명이 반복될 때 NLI forward 생략
+    - 크기 상한(maxsize) 초과 시 가장 오래 안 쓴 항목부터 제거(LRU), ttl 초가 지난 항목은 무효
+    값에는 점수만 저장하고 threshold 적용은 호출 측에서 하므로 임계값이 바뀌어도 재사용 가능.
+    """
+    def __init__(self, maxsize=256, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = OrderedDict()     # key -> (저장 시각, value, 계산 시간)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.time_saved = 0.0           # 적중으로 아낀 계산 시간(초, 저장 당시 측정값 합)
+
+    def get(self, key, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                stored, value, cost = item
+                if now - stored <= self.ttl:
+                    self._items.move_to_end(key)
+                    self.hits += 1
+                    self.time_saved += cost
+                    return value
+                del self._items[key]
+                self.expired += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, value, cost=0.0, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._items[key] = (now, value, cost)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "entries": len(self._items),
+                "time_saved_s": self.time_saved,
+            }
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# 실행 방식과 같게: system/ 모듈은 평면 import + HardwareSystem 패키지, HardwareSystem/ 모듈은 평면 import
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+for sub in ("", "system", "HardwareSystem"):
+    path = os.path.normpath(os.path.join(SRC, sub))
+    if path not in sys.path:
+        sys.path.insert(0, path)
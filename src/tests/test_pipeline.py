@@ -0,0 +1,87 @@
+import queue
+import threading
+import time
+
+from Pipeline import Reorderer, Stage
+
+
+class _Job:
+    def __init__(self, seq):
+        self.seq = seq
+        self.error = None
+
+
+def _run_stage(fn, items, expect, **kwargs):
+    """items를 넣고 결과 expect개를 받은 뒤 멈춤 → (결과 목록, stage)"""
+    in_q, out_q = queue.Queue(), queue.Queue()
+    stop = threading.Event()
+    stage = Stage("test", fn, in_q, out_q, stop=stop.is_set, **kwargs).start()
+    for item in items:
+        in_q.put(item)
+    out = [out_q.get(timeout=2.0) for _ in range(expect)]
+    deadline = time.monotonic() + 2.0
+    while stage.processed < len(items) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stop.set()
+    stage.join(timeout=2.0)
+    assert out_q.empty()
+    return out, stage
+
+
+def test_reorderer_releases_in_sequence():
+    r = Reorderer()
+    assert r.push(2, "c") == []
+    assert r.push(1, "b") == []
+    assert r.pending() == 2
+    assert r.push(0, "a") == ["a", "b", "c"]
+    assert r.push(4, "e") == []
+    assert r.push(3, "d") == ["d", "e"]
+    assert r.pending() == 0
+    assert r.max_pending == 3
+
+
+def test_reorderer_holds_everything_behind_a_gap():
+    r = Reorderer()
+    for seq in (1, 2, 3):
+        assert r.push(seq, seq) == []
+    assert r.pending() == 3
+
+
+def test_stage_forwards_failed_job_with_error():
+    def fn(job):
+        if job.seq == 1:
+            raise ValueError("boom")
+        return job
+
+    out, stage = _run_stage(fn, [_Job(0), _Job(1), _Job(2)], expect=3)
+    # 실패한 job도 다음 단계로 넘어가야 순서 복원이 끊기지 않음
+    assert sorted(j.seq for j in out) == [0, 1, 2]
+    assert isinstance(next(j for j in out if j.seq == 1).error, ValueError)
+    assert stage.stats()["errors"] == 1
+    assert stage.stats()["dropped"] == 0
+
+
+def test_stage_drops_tuple_items_and_keeps_running():
+    dropped = []
+
+    def fn(item):
+        if item[0] % 2:
+            raise RuntimeError("bad frame")
+        return item
+
+    out, stage = _run_stage(fn, [(0, "a"), (1, "b"), (2, "c"), (3, "d")], expect=2,
+                            on_drop=lambda item, e: dropped.append(item))
+    assert out == [(0, "a"), (2, "c")]
+    assert dropped == [(1, "b"), (3, "d")]
+    s = stage.stats()
+    assert (s["processed"], s["errors"], s["dropped"]) == (4, 2, 2)
+
+
+def test_stage_survives_failing_on_drop():
+    def on_drop(item, e):
+        raise RuntimeError("release failed")
+
+    out, stage = _run_stage(lambda item: 1 / 0 if item[0] == 0 else item, [(0,), (1,)], expect=1,
+                            on_drop=on_drop)
+    assert out == [(1,)]
+    assert stage.stats()["dropped"] == 1
@@ -0,0 +1,97 @@
+from SpeechQueue import SpeechQueue, PRIORITY_CRITICAL, PRIORITY_NORMAL, PRIORITY_INFO
+
+
+def _drain(q):
+    out = []
+    while True:
+        item = q.get(timeout=0)
+        if item is None:
+            return out
+        out.append(item[0])
+
+
+def test_priority_order_then_fifo():
+    q = SpeechQueue()
+    q.put("info", False, PRIORITY_INFO)
+    q.put("a", False, PRIORITY_NORMAL)
+    q.put("b", False, PRIORITY_NORMAL)
+    q.put("alert", False, PRIORITY_CRITICAL)
+    assert _drain(q) == ["alert", "a", "b", "info"]
+
+
+def test_get_times_out_when_empty():
+    assert SpeechQueue().get(timeout=0.01) is None
+
+
+def test_coalesces_pending_duplicates():
+    q = SpeechQueue()
+    assert q.put("same", False, PRIORITY_NORMAL, ts=1.0)
+    assert q.put("same", False, PRIORITY_NORMAL, ts=2.0)
+    q.put("same", True, PRIORITY_NORMAL)        # slow가 다르면 다른 발화
+    assert q.qsize() == 2
+    assert q.coalesced == 1
+    assert q.get(timeout=0) == ("same", False, PRIORITY_NORMAL, 1.0)
+
+
+def test_coalesce_upgrades_priority_and_keeps_first_ts():
+    q = SpeechQueue()
+    q.put("a", False, PRIORITY_NORMAL, ts=1.0)
+    q.put("b", False, PRIORITY_NORMAL, ts=2.0)
+    q.put("b", False, PRIORITY_CRITICAL, ts=3.0)
+    assert q.qsize() == 2
+    assert q.get(timeout=0) == ("b", False, PRIORITY_CRITICAL, 2.0)
+    # 올리기 전 항목이 힙에 남아 있어도 다시 나오지 않음
+    assert _drain(q) == ["a"]
+
+
+def test_coalesce_never_lowers_priority():
+    q = SpeechQueue()
+    q.put("alert", False, PRIORITY_CRITICAL)
+    q.put("x", False, PRIORITY_NORMAL)
+    q.put("alert", False, PRIORITY_INFO)
+    assert _drain(q) == ["alert", "x"]
+
+
+def test_front_reinsert_goes_ahead_of_same_priority_only():
+    # 긴급 발화에 끊긴 발화의 남은 문장은 같은 우선순위 맨 앞으로, 긴급 발화 뒤로
+    q = SpeechQueue()
+    q.put("next answer", False, PRIORITY_NORMAL)
+    q.put("alert", False, PRIORITY_CRITICAL)
+    q.put("rest of cut answer", False, PRIORITY_NORMAL, front=True)
+    assert _drain(q) == ["alert", "rest of cut answer", "next answer"]
+
+
+def test_full_queue_evicts_oldest_least_urgent_by_arrival():
+    q = SpeechQueue(maxsize=3)
+    q.put("x", False, PRIORITY_NORMAL)
+    q.put("y", False, PRIORITY_NORMAL)
+    q.put("r", False, PRIORITY_NORMAL, front=True)    # 힙 맨 앞이지만 가장 늦게 도착
+    assert q.put("z", False, PRIORITY_NORMAL)
+    assert q.dropped["normal"] == 1
+    assert _drain(q) == ["r", "y", "z"]
+
+
+def test_full_queue_evicts_info_before_normal():
+    q = SpeechQueue(maxsize=2)
+    q.put("status", False, PRIORITY_INFO)
+    q.put("answer", False, PRIORITY_NORMAL)
+    assert q.put("alert", False, PRIORITY_CRITICAL)
+    assert q.dropped["info"] == 1
+    assert _drain(q) == ["alert", "answer"]
+
+
+def test_full_queue_rejects_less_urgent_newcomer():
+    q = SpeechQueue(maxsize=2)
+    q.put("a", False, PRIORITY_CRITICAL)
+    q.put("b", False, PRIORITY_NORMAL)
+    assert not q.put("status", False, PRIORITY_INFO)
+    assert q.dropped["info"] == 1
+    assert _drain(q) == ["a", "b"]
+
+
+def test_clear_empties_queue():
+    q = SpeechQueue()
+    q.put("a", False, PRIORITY_NORMAL)
+    q.clear()
+    assert q.qsize() == 0
+    assert q.get(timeout=0) is None